@@ -5,12 +5,13 @@ import nested_admin
 from apps.quizz.models import (
     Category, TopLevelCategory, SubCategory,
     Quiz, QuestionOption, OrderQuiz, QuizQuestion, UploadTests, UserTestAnswers,
-    TestAnswerQuestion
+    TestAnswerQuestion, ImportJob
 )
 
 
 class CategoryAdmin(admin.ModelAdmin):
     list_display = ('name', 'parent', 'created_at')
+    list_select_related = ('parent',)
     search_fields = ('name',)
     ordering = ('created_at',)
 
@@ -72,6 +73,7 @@ class QuizAdmin(nested_admin.NestedModelAdmin):
     list_display = ['title', 'get_category_name', 'created_at']
     search_fields = ['title']
     list_filter = ['category']
+    list_select_related = ['category']
     inlines = [QuizQuestionInline]
 
     def get_category_name(self, obj):
@@ -91,6 +93,14 @@ class UploadTestsAdmin(admin.ModelAdmin):
     search_fields = ['quiz__title']
 
 
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'quiz', 'status', 'questions_parsed', 'questions_inserted', 'created_at', 'finished_at']
+    list_filter = ['status']
+    list_select_related = ['quiz']
+    readonly_fields = ['status', 'questions_parsed', 'questions_inserted', 'error', 'started_at', 'finished_at']
+
+
 @admin.register(OrderQuiz)
 class OrderQuizAdmin(admin.ModelAdmin):
     list_display = ['quiz__title', 'author', 'created_at']
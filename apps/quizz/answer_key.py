@@ -0,0 +1,61 @@
+from django.core.cache import cache
+
+from apps.quizz.models import QuestionOption
+from apps.quizz.question_cache import get_question_payloads
+
+ANSWER_KEY_VERSION = 1
+ANSWER_KEY_TIMEOUT = 60 * 60 * 24
+
+
+def option_key(option_id):
+    return f'quizz:answer-key:option:{option_id}:v{ANSWER_KEY_VERSION}'
+
+
+def get_option_entries(option_ids):
+    """
+    Returns ``{option_id: (question_id, quiz_id, is_correct)}`` for the
+    existing options among ``option_ids``. Cache misses are loaded with one
+    query.
+    """
+    keys = {option_key(option_id): option_id for option_id in set(option_ids)}
+    entries = {keys[key]: entry for key, entry in cache.get_many(keys).items()}
+
+    missing = [option_id for option_id in keys.values() if option_id not in entries]
+    if missing:
+        loaded = {
+            option_id: (question_id, quiz_id, bool(is_correct))
+            for option_id, question_id, quiz_id, is_correct in QuestionOption.objects.filter(
+                id__in=missing
+            ).values_list('id', 'question_id', 'question__quiz_id', 'is_correct')
+        }
+        cache.set_many({option_key(option_id): entry for option_id, entry in loaded.items()}, ANSWER_KEY_TIMEOUT)
+        entries.update(loaded)
+
+    return entries
+
+
+def get_option_entry(option_id):
+    return get_option_entries([option_id]).get(option_id)
+
+
+def get_correct_options(question_id):
+    payload = get_question_payloads([question_id]).get(question_id)
+    if payload is None:
+        return []
+    return [{'id': option['id'], 'text': option['text']} for option in payload['options'] if option['is_correct']]
+
+
+def get_correct_option_ids(question_ids):
+    return {
+        question_id: [option['id'] for option in payload['options'] if option['is_correct']]
+        for question_id, payload in get_question_payloads(question_ids).items()
+    }
+
+
+def invalidate_option(option_id):
+    cache.delete(option_key(option_id))
+
+
+def invalidate_question_options(question_id):
+    option_ids = QuestionOption.objects.filter(question_id=question_id).values_list('id', flat=True)
+    cache.delete_many([option_key(option_id) for option_id in option_ids])
@@ -8,3 +8,6 @@ class QuizzConfig(AppConfig):
 
     def ready(self):
         import apps.quizz.signals
+        from apps.quizz.cache import check_shared_cache
+
+        check_shared_cache()
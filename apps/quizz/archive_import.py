@@ -0,0 +1,114 @@
+import json
+import multiprocessing
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.db import transaction
+
+from apps.quizz.models import Quiz, SubCategory
+from apps.quizz.parsing import parse_archive_member
+from apps.quizz.utils import import_questions
+
+MANIFEST_NAME = 'manifest.json'
+
+
+def archive_members(archive):
+    return [
+        info.filename for info in archive.infolist()
+        if not info.is_dir()
+        and info.filename.lower().endswith('.txt')
+        and not info.filename.startswith('__MACOSX/')
+        and not os.path.basename(info.filename).startswith('.')
+    ]
+
+
+def read_manifest(archive):
+    """
+    ``manifest.json`` maps file names to a quiz id or to
+    ``{"quiz_id": ..., "title": ..., "category": "<slug>"}``.
+    """
+    if MANIFEST_NAME not in archive.namelist():
+        return {}
+    manifest = json.loads(archive.read(MANIFEST_NAME))
+    return {
+        name: entry if isinstance(entry, dict) else {'quiz_id': entry}
+        for name, entry in manifest.get('files', manifest).items()
+    }
+
+
+def resolve_quiz(name, entry, default_category=None):
+    """
+    Finds the quiz a file is imported into: by the manifest quiz id, else by
+    title (the manifest title or the file name) within the category,
+    creating the quiz when it does not exist yet.
+    """
+    if entry.get('quiz_id'):
+        return Quiz.objects.get(id=entry['quiz_id'])
+
+    category = default_category
+    if entry.get('category'):
+        category = SubCategory.objects.get(slug=entry['category'])
+
+    title = entry.get('title') or os.path.splitext(os.path.basename(name))[0]
+    quiz = Quiz.objects.filter(title=title, category=category).order_by('id').first()
+    return quiz or Quiz.objects.create(title=title, category=category)
+
+
+def import_archive(archive_path, default_category=None, workers=None, progress=None):
+    """
+    Imports every ``.txt`` file of a zip archive. Files are parsed in
+    parallel in a process pool while this process writes them one after
+    another in a single transaction. Returns a report with per-file counts
+    and timings.
+    """
+    started = time.perf_counter()
+
+    with zipfile.ZipFile(archive_path) as archive:
+        names = archive_members(archive)
+        manifest = read_manifest(archive)
+
+    if not names:
+        raise ValueError('Archive contains no .txt files')
+
+    files = []
+    parsed_total = inserted_total = 0
+
+    with transaction.atomic():
+        quizzes = {name: resolve_quiz(name, manifest.get(name, {}), default_category) for name in names}
+
+        # spawn keeps the workers clear of the parent's threads and DB connections.
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            futures = [pool.submit(parse_archive_member, archive_path, name) for name in names]
+
+            for future in as_completed(futures):
+                name, questions, parse_seconds = future.result()
+                quiz = quizzes[name]
+
+                write_started = time.perf_counter()
+                inserted = import_questions(
+                    quiz, questions,
+                    progress=progress and (
+                        lambda parsed, done: progress(parsed_total + parsed, inserted_total + done)
+                    )
+                )
+                parsed_total += len(questions)
+                inserted_total += inserted
+
+                files.append({
+                    'file': name,
+                    'quiz_id': quiz.id,
+                    'questions_parsed': len(questions),
+                    'questions_inserted': inserted,
+                    'parse_seconds': round(parse_seconds, 3),
+                    'write_seconds': round(time.perf_counter() - write_started, 3),
+                })
+
+    return {
+        'files': sorted(files, key=lambda file: file['file']),
+        'questions_parsed': parsed_total,
+        'questions_inserted': inserted_total,
+        'seconds': round(time.perf_counter() - started, 3),
+    }
@@ -0,0 +1,30 @@
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+
+
+def get_version(key):
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(key):
+    cache.set(key, uuid4().hex, None)
+
+
+def check_shared_cache():
+    """
+    Version stamps and test sessions only work if every process sees the
+    same cache, so a per-process LocMemCache is refused at startup.
+    """
+    if isinstance(caches[DEFAULT_CACHE_ALIAS], LocMemCache) and not settings.QUIZZ_ALLOW_PROCESS_LOCAL_CACHE:
+        raise ImproperlyConfigured(
+            'apps.quizz needs a cache shared by all processes (Redis, Memcached or the database cache), '
+            'not LocMemCache.'
+        )
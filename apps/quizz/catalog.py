@@ -0,0 +1,65 @@
+from django.core.cache import cache
+from django.utils.translation import get_language
+from rest_framework.renderers import JSONRenderer
+
+from apps.quizz.category_tree import get_category_tree
+from apps.quizz.conditional import get_catalog_state
+from apps.quizz.models import Quiz
+
+BUNDLE_TIMEOUT = 60 * 60 * 24
+
+
+def quiz_choices():
+    return {
+        "year_choices": [{"id": choice[0], "label": choice[1]} for choice in Quiz.YEAR_CHOICES],
+        "mode_of_study_choices": [{"id": choice[0], "label": choice[1]} for choice in Quiz.MODE_OF_STUDY_CHOICES],
+    }
+
+
+def build_catalog_bundle():
+    """
+    Builds the degree -> field -> quiz tree together with the choice tables
+    from the category snapshot and a single Quiz query.
+    """
+    category_tree = get_category_tree()
+    semesters = dict(Quiz.SEMESTER_CHOICES)
+    modes_of_study = dict(Quiz.MODE_OF_STUDY_CHOICES)
+    years = dict(Quiz.YEAR_CHOICES)
+
+    quizzes_by_category = {}
+    quizzes = Quiz.objects.filter(category__isnull=False).order_by('-id').values(
+        'id', 'title', 'price', 'semester', 'mode_of_study', 'year', 'category_id', 'created_at'
+    )
+    for quiz in quizzes:
+        quizzes_by_category.setdefault(quiz.pop('category_id'), []).append({
+            **quiz,
+            'semester': semesters.get(quiz['semester']),
+            'mode_of_study': modes_of_study.get(quiz['mode_of_study']),
+            'year': years.get(quiz['year']),
+        })
+
+    degrees = []
+    for degree in category_tree.top_level():
+        fields = [
+            {
+                'id': field['id'],
+                'name': field['name'],
+                'slug': field['slug'],
+                'quizzes': quizzes_by_category.get(field['id'], []),
+            }
+            for field in category_tree.subcategories(degree['id'])
+        ]
+        degrees.append({'id': degree['id'], 'name': degree['name'], 'slug': degree['slug'], 'fields': fields})
+
+    return {'degrees': degrees, **quiz_choices()}
+
+
+def get_catalog_bundle():
+    version, _ = get_catalog_state()
+    key = f'quizz:catalog:bundle:{version}:{get_language()}'
+
+    content = cache.get(key)
+    if content is None:
+        content = JSONRenderer().render(build_catalog_bundle())
+        cache.set(key, content, BUNDLE_TIMEOUT)
+    return content
@@ -0,0 +1,54 @@
+from apps.quizz.cache import get_version, bump_version
+from apps.quizz.models import Category
+
+VERSION_KEY = 'quizz:category-tree:version'
+
+
+class CategoryTree:
+    """
+    Immutable snapshot of the category table built from a single query.
+    """
+    __slots__ = ('version', 'nodes', 'children', 'slugs')
+
+    def __init__(self, version, rows):
+        self.version = version
+        self.nodes = {}
+        self.children = {}
+        self.slugs = {}
+
+        for row in rows:
+            self.nodes[row['id']] = row
+            self.children.setdefault(row['parent_id'], []).append(row['id'])
+            self.children.setdefault(row['id'], [])
+            if row['slug']:
+                self.slugs[row['slug']] = row['id']
+
+    def top_level(self):
+        return [self.nodes[category_id] for category_id in self.children.get(None, [])]
+
+    def subcategories(self, category_id):
+        return [self.nodes[child_id] for child_id in self.children.get(category_id, [])]
+
+    def id_for_slug(self, slug):
+        return self.slugs.get(slug)
+
+    def path_for_slug(self, slug):
+        node = self.nodes.get(self.slugs.get(slug))
+        return node['path'] if node else None
+
+
+_snapshot = None
+
+
+def get_category_tree():
+    global _snapshot
+
+    version = get_version(VERSION_KEY)
+    if _snapshot is None or _snapshot.version != version:
+        rows = Category.objects.order_by('id').values('id', 'name', 'slug', 'parent_id', 'path')
+        _snapshot = CategoryTree(version, rows)
+    return _snapshot
+
+
+def invalidate_category_tree():
+    bump_version(VERSION_KEY)
@@ -0,0 +1,83 @@
+import hashlib
+import json
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.utils.http import parse_etags, quote_etag
+from django.utils.timezone import now
+from rest_framework import status
+from rest_framework.response import Response
+
+from apps.quizz.cache import get_version, bump_version
+
+CATALOG_STATE_KEY = 'quizz:catalog:state'
+
+
+def payload_etag(data):
+    payload = json.dumps(data, sort_keys=True, default=str, separators=(',', ':'))
+    return quote_etag(hashlib.md5(payload.encode('utf-8')).hexdigest())
+
+
+def etag_matches(request, etag):
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if not if_none_match:
+        return False
+    etags = parse_etags(if_none_match)
+    return '*' in etags or etag in etags
+
+
+def conditional_response(request, data):
+    etag = payload_etag(data)
+
+    if etag_matches(request, etag):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(data, status=status.HTTP_200_OK)
+
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def get_catalog_state():
+    """
+    Returns ``(version, modified_at)`` of the catalog (categories and
+    quizzes). Both change whenever a Category or Quiz row is written.
+    """
+    state = cache.get(CATALOG_STATE_KEY)
+    if state is None:
+        cache.add(CATALOG_STATE_KEY, (uuid4().hex, now().replace(microsecond=0)), None)
+        state = cache.get(CATALOG_STATE_KEY)
+    return state
+
+
+def bump_catalog_version():
+    cache.set(CATALOG_STATE_KEY, (uuid4().hex, now().replace(microsecond=0)), None)
+
+
+def orders_version_key(user_id):
+    return f'quizz:orders:{user_id}:version'
+
+
+def bump_orders_version(user_id):
+    bump_version(orders_version_key(user_id))
+
+
+def catalog_etag(request, *args, **kwargs):
+    version, _ = get_catalog_state()
+    return hashlib.md5(f'{version}:{request.get_full_path()}'.encode('utf-8')).hexdigest()
+
+
+def catalog_last_modified(request, *args, **kwargs):
+    _, modified_at = get_catalog_state()
+    return modified_at
+
+
+def quiz_list_etag(request, *args, **kwargs):
+    user = request.user
+    if user and user.is_authenticated:
+        viewer = f'{user.pk}:{get_version(orders_version_key(user.pk))}'
+    else:
+        viewer = 'anonymous'
+    version, _ = get_catalog_state()
+    return hashlib.md5(f'{version}:{viewer}:{request.get_full_path()}'.encode('utf-8')).hexdigest()
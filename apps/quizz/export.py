@@ -0,0 +1,67 @@
+import json
+from itertools import groupby
+
+from apps.quizz.models import QuizQuestion
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_BUFFER_SIZE = 64 * 1024
+
+EXPORT_FORMATS = {
+    'txt': 'text/plain; charset=utf-8',
+    'jsonl': 'application/x-ndjson',
+}
+
+
+def iter_quiz_questions(quiz_id, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yields ``{'id', 'title', 'options'}`` for every question of a quiz. One
+    LEFT JOIN query is read through ``.iterator()``, so only ``chunk_size``
+    rows are held in memory at a time.
+    """
+    rows = QuizQuestion.objects.filter(quiz_id=quiz_id).order_by('id', 'options__id').values_list(
+        'id', 'title', 'options__id', 'options__text', 'options__is_correct'
+    ).iterator(chunk_size=chunk_size)
+
+    for question_id, question_rows in groupby(rows, key=lambda row: row[0]):
+        question = {'id': question_id, 'options': []}
+        for _, title, option_id, text, is_correct in question_rows:
+            question['title'] = title
+            if option_id is not None:
+                question['options'].append({'text': text, 'is_correct': bool(is_correct)})
+        yield question
+
+
+def single_line(text):
+    return ' '.join((text or '').split())
+
+
+def format_txt(question):
+    lines = [f"# {single_line(question['title'])}"]
+    lines.extend(
+        f"{'+' if option['is_correct'] else '-'} {single_line(option['text'])}" for option in question['options']
+    )
+    return '\n'.join(lines) + '\n\n'
+
+
+def format_jsonl(question):
+    return json.dumps(question, ensure_ascii=False) + '\n'
+
+
+def iter_export(quiz_id, export_format='txt', chunk_size=EXPORT_CHUNK_SIZE, buffer_size=EXPORT_BUFFER_SIZE):
+    """
+    Yields the quiz in the ``#``/``+``/``-`` text format or as JSON lines,
+    joined into blocks of about ``buffer_size`` characters.
+    """
+    formatter = format_jsonl if export_format == 'jsonl' else format_txt
+    buffer, size = [], 0
+
+    for question in iter_quiz_questions(quiz_id, chunk_size):
+        text = formatter(question)
+        buffer.append(text)
+        size += len(text)
+        if size >= buffer_size:
+            yield ''.join(buffer)
+            buffer, size = [], 0
+
+    if buffer:
+        yield ''.join(buffer)
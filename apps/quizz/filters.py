@@ -0,0 +1,25 @@
+from apps.quizz.category_tree import get_category_tree
+
+CATALOG_FILTERS = ('mode_of_study', 'year', 'field', 'degree')
+
+
+def filter_quizzes(queryset, params):
+    mode_of_study = params.get('mode_of_study')
+    if mode_of_study:
+        queryset = queryset.filter(mode_of_study=mode_of_study)
+
+    year = params.get('year')
+    if year:
+        queryset = queryset.filter(year=year)
+
+    sub_category = params.get('field')
+    if sub_category:
+        category_id = get_category_tree().id_for_slug(sub_category)
+        queryset = queryset.filter(category_id=category_id) if category_id else queryset.none()
+
+    top_level_category = params.get('degree')
+    if top_level_category:
+        category_path = get_category_tree().path_for_slug(top_level_category)
+        queryset = queryset.under_category(category_path) if category_path else queryset.none()
+
+    return queryset
@@ -0,0 +1,92 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connection, connections
+from django.utils.timezone import now
+
+from apps.quizz.archive_import import import_archive
+from apps.quizz.models import ImportJob
+from apps.quizz.utils import import_tests_from_file
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_import(file, quiz, author=None):
+    return ImportJob.objects.create(file=file, quiz=quiz, author=author)
+
+
+def enqueue_archive_import(file, category=None, author=None):
+    return ImportJob.objects.create(kind=ImportJob.ARCHIVE, file=file, category=category, author=author)
+
+
+def claim_jobs(limit):
+    """
+    Moves up to ``limit`` pending jobs to running and returns their ids. The
+    conditional UPDATE lets several workers poll the same queue without
+    picking up a job twice.
+    """
+    claimed = []
+    candidates = ImportJob.objects.filter(status=ImportJob.PENDING).order_by('id').values_list('id', flat=True)
+    for job_id in list(candidates[:limit]):
+        updated = ImportJob.objects.filter(pk=job_id, status=ImportJob.PENDING).update(
+            status=ImportJob.RUNNING, started_at=now()
+        )
+        if updated:
+            claimed.append(job_id)
+    return claimed
+
+
+class ProgressReporter:
+    """
+    Writes job progress from a thread with its own connection, so it is
+    visible while the import transaction is still open. SQLite keeps the
+    write lock for the whole import, so there the counters are only written
+    when the job finishes.
+    """
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self.parsed = self.inserted = 0
+        self.executor = None if connection.vendor == 'sqlite' else ThreadPoolExecutor(max_workers=1)
+        self.pending = None
+
+    def __call__(self, parsed, inserted):
+        self.parsed, self.inserted = parsed, inserted
+        if self.executor is None or (self.pending and not self.pending.done()):
+            return
+        self.pending = self.executor.submit(self.write, parsed, inserted)
+
+    def write(self, parsed, inserted):
+        ImportJob.objects.filter(pk=self.job_id).update(questions_parsed=parsed, questions_inserted=inserted)
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.submit(connections.close_all)
+            self.executor.shutdown(wait=True)
+
+
+def run_import_job(job_id):
+    job = ImportJob.objects.get(pk=job_id)
+    reporter = ProgressReporter(job.id)
+
+    report = None
+    try:
+        if job.kind == ImportJob.ARCHIVE:
+            report = import_archive(job.file.path, default_category=job.category, progress=reporter)
+        elif job.quiz_id:
+            import_tests_from_file(job.file.path, job.quiz, progress=reporter)
+        else:
+            raise ValueError('Import job has no quiz')
+    except Exception as e:
+        logger.exception('Import job %s failed', job.id)
+        # The import transaction was rolled back, nothing is left inserted.
+        result = {'status': ImportJob.FAILED, 'error': str(e), 'questions_inserted': 0}
+    else:
+        result = {'status': ImportJob.DONE, 'error': None, 'questions_inserted': reporter.inserted}
+    finally:
+        reporter.close()
+
+    ImportJob.objects.filter(pk=job.id).update(
+        questions_parsed=reporter.parsed, report=report, finished_at=now(), **result
+    )
+    return result['status']
@@ -0,0 +1,45 @@
+import os
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.quizz.models import Quiz
+from apps.quizz.utils import import_tests_from_file, IMPORT_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = "Measure question import throughput on a synthetic file. All data is rolled back."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--questions', type=int, default=100000)
+        parser.add_argument('--options', type=int, default=4)
+        parser.add_argument('--chunk-size', type=int, default=IMPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        questions = options['questions']
+
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', suffix='.txt', delete=False) as file:
+            for number in range(questions):
+                file.write(f'# Question {number}: what is {number} + {number}?\n')
+                for option in range(options['options']):
+                    file.write(f'{"+" if option == 0 else "-"} Answer {number * 2 + option}\n')
+            path = file.name
+
+        size = os.path.getsize(path) / 1024 / 1024
+        self.stdout.write(f'Synthetic file: {questions} questions, {size:.1f} MB')
+
+        try:
+            with transaction.atomic():
+                quiz = Quiz.objects.create(title='Import benchmark')
+
+                started = time.perf_counter()
+                imported = import_tests_from_file(path, quiz, chunk_size=options['chunk_size'])
+                elapsed = time.perf_counter() - started
+
+                transaction.set_rollback(True)
+        finally:
+            os.remove(path)
+
+        self.stdout.write(f'Imported {imported} questions in {elapsed:.2f} s: {imported / elapsed:,.0f} questions/s')
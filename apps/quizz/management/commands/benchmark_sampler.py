@@ -0,0 +1,53 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.quizz.models import Quiz, QuizQuestion
+from apps.quizz.sampler import question_sampler
+
+
+class Command(BaseCommand):
+    help = "Compare ORDER BY RANDOM() against the in-memory question sampler. All data is rolled back."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--questions', type=int, default=50000)
+        parser.add_argument('--draws', type=int, default=200)
+
+    def handle(self, *args, **options):
+        questions = options['questions']
+        draws = options['draws']
+
+        with transaction.atomic():
+            quiz = Quiz.objects.create(title='Sampler benchmark')
+            QuizQuestion.objects.bulk_create(
+                (QuizQuestion(quiz=quiz, title=f'Question {number}') for number in range(questions)),
+                batch_size=5000,
+            )
+            self.stdout.write(f'Quiz with {questions} questions, {draws} draws each.')
+
+            started = time.perf_counter()
+            for _ in range(draws):
+                list(QuizQuestion.objects.filter(quiz=quiz).order_by('?')[:1])
+            self.report('order_by("?")', started, draws)
+
+            started = time.perf_counter()
+            question_sampler.get_pool(quiz.id)
+            self.report('sampler pool build', started, 1)
+
+            started = time.perf_counter()
+            for _ in range(draws):
+                list(QuizQuestion.objects.filter(id__in=question_sampler.draw(quiz.id)))
+            self.report('sampler draw + fetch', started, draws)
+
+            started = time.perf_counter()
+            for _ in range(draws):
+                question_sampler.draw(quiz.id, k=25)
+            self.report('sampler draw 25 (no DB)', started, draws)
+
+            question_sampler.invalidate(quiz.id)
+            transaction.set_rollback(True)
+
+    def report(self, label, started, draws):
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f'{label:<28} total {elapsed * 1000:9.1f} ms   per call {elapsed * 1000 / draws:8.3f} ms')
@@ -0,0 +1,67 @@
+from itertools import combinations
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from apps.quizz.filters import CATALOG_FILTERS, filter_quizzes
+from apps.quizz.models import Quiz, Category
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAIN every filter combination supported by QuizListView and fail on sequential scans of Quiz. "
+        "Run it against a database with production-sized tables, planners scan small tables anyway."
+    )
+
+    def handle(self, *args, **options):
+        failures = []
+        skipped = []
+        sample_params = self.sample_params()
+
+        for size in range(1, len(CATALOG_FILTERS) + 1):
+            for names in combinations(CATALOG_FILTERS, size):
+                params = {name: sample_params[name] for name in names}
+                queryset = filter_quizzes(Quiz.objects.order_by('-id'), params)[:25]
+
+                if queryset.query.is_empty():
+                    skipped.append(names)
+                    self.stdout.write(self.style.ERROR(f'no query  {", ".join(names)}'))
+                    continue
+
+                plan = queryset.explain()
+
+                if self.has_sequential_scan(plan):
+                    failures.append(names)
+                    self.stdout.write(self.style.ERROR(f'SEQ SCAN  {", ".join(names)}'))
+                    self.stdout.write(plan)
+                else:
+                    self.stdout.write(self.style.SUCCESS(f'index     {", ".join(names)}'))
+
+        if skipped:
+            raise CommandError(f'{len(skipped)} filter combination(s) could not be explained.')
+        if failures:
+            raise CommandError(f'{len(failures)} filter combination(s) scan the whole quiz table.')
+
+    def sample_params(self):
+        field = Category.objects.filter(
+            slug__isnull=False, parent__slug__isnull=False
+        ).select_related('parent').first()
+        if not field:
+            raise CommandError('Needs a field category with a slug under a degree with a slug.')
+
+        return {
+            'mode_of_study': Quiz.MODE_OF_STUDY_CHOICES[0][0],
+            'year': Quiz.YEAR_CHOICES[0][0],
+            'field': field.slug,
+            'degree': field.parent.slug,
+        }
+
+    def has_sequential_scan(self, plan):
+        table = Quiz._meta.db_table
+
+        for line in plan.splitlines():
+            if connection.vendor == 'postgresql' and 'Seq Scan on' in line and table in line:
+                return True
+            if connection.vendor == 'sqlite' and f'SCAN {table}' in line and 'USING' not in line:
+                return True
+        return False
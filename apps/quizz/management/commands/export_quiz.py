@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.quizz.export import EXPORT_FORMATS, iter_export
+from apps.quizz.models import Quiz
+
+
+class Command(BaseCommand):
+    help = "Stream the questions of a quiz to a file or stdout in the upload text format or as JSON lines."
+
+    def add_arguments(self, parser):
+        parser.add_argument('quiz_id', type=int)
+        parser.add_argument('--format', choices=list(EXPORT_FORMATS), default='txt')
+        parser.add_argument('--output', help="Output file, stdout by default.")
+
+    def handle(self, *args, **options):
+        if not Quiz.objects.filter(id=options['quiz_id']).exists():
+            raise CommandError(f"Quiz {options['quiz_id']} does not exist")
+
+        blocks = iter_export(options['quiz_id'], options['format'])
+
+        if not options['output']:
+            for block in blocks:
+                self.stdout.write(block, ending='')
+            return
+
+        with open(options['output'], 'w', encoding='utf-8') as output:
+            output.writelines(blocks)
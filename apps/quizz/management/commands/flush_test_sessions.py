@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.quizz.sessions import flush_all_sessions
+
+
+class Command(BaseCommand):
+    help = "Write the cached answers of active deck tests to the database. Run every minute from cron."
+
+    def handle(self, *args, **options):
+        flushed = flush_all_sessions()
+        self.stdout.write(self.style.SUCCESS(f"Flushed {flushed} test session(s)"))
@@ -0,0 +1,38 @@
+import zipfile
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.quizz.archive_import import import_archive
+from apps.quizz.models import SubCategory
+
+
+class Command(BaseCommand):
+    help = "Import a zip archive of question files, parsing the files in parallel."
+
+    def add_arguments(self, parser):
+        parser.add_argument('archive')
+        parser.add_argument('--category', help="Slug of the category for quizzes created from file names.")
+        parser.add_argument('--workers', type=int, default=None)
+
+    def handle(self, *args, **options):
+        category = None
+        if options['category']:
+            try:
+                category = SubCategory.objects.get(slug=options['category'])
+            except SubCategory.DoesNotExist:
+                raise CommandError(f"Unknown category: {options['category']}")
+
+        try:
+            report = import_archive(options['archive'], default_category=category, workers=options['workers'])
+        except (OSError, ValueError, zipfile.BadZipFile, ObjectDoesNotExist) as e:
+            raise CommandError(str(e))
+
+        for file in report['files']:
+            self.stdout.write(
+                f"{file['file']}: quiz {file['quiz_id']}, {file['questions_inserted']}/{file['questions_parsed']} "
+                f"questions, parsed in {file['parse_seconds']:.2f} s, written in {file['write_seconds']:.2f} s"
+            )
+        self.stdout.write(
+            f"{len(report['files'])} files, {report['questions_inserted']} questions in {report['seconds']:.2f} s"
+        )
@@ -0,0 +1,49 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+
+from apps.quizz.import_jobs import claim_jobs, run_import_job
+
+
+def run_in_thread(job_id):
+    try:
+        return run_import_job(job_id)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = "Process queued question import jobs with a pool of worker threads."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2)
+        parser.add_argument('--poll-interval', type=float, default=2.0)
+        parser.add_argument('--once', action='store_true', help="Exit once the queue is empty.")
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        if connection.vendor == 'sqlite' and workers > 1:
+            # SQLite allows one writer at a time, parallel imports would only wait on each other.
+            self.stdout.write('SQLite database: using a single worker.')
+            workers = 1
+
+        running = {}
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            while True:
+                for future, job_id in list(running.items()):
+                    if future.done():
+                        del running[future]
+                        self.stdout.write(f'Import job {job_id}: {future.result()}')
+
+                job_ids = claim_jobs(workers - len(running)) if len(running) < workers else []
+                for job_id in job_ids:
+                    running[pool.submit(run_in_thread, job_id)] = job_id
+
+                if options['once'] and not running:
+                    break
+                if running:
+                    wait(running, timeout=options['poll_interval'], return_when=FIRST_COMPLETED)
+                elif not job_ids:
+                    time.sleep(options['poll_interval'])
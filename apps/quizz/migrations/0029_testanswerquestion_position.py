@@ -0,0 +1,18 @@
+# Generated by Django 5.1.3 on 2026-10-18 02:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizz', '0028_usertestanswers_is_completed_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='testanswerquestion',
+            name='position',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Порядковый номер'),
+        ),
+    ]
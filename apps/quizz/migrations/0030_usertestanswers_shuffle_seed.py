@@ -0,0 +1,19 @@
+# Generated by Django 5.1.3 on 2026-10-18 02:58
+
+import apps.quizz.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizz', '0029_testanswerquestion_position'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usertestanswers',
+            name='shuffle_seed',
+            field=models.PositiveIntegerField(blank=True, default=apps.quizz.models.generate_shuffle_seed, null=True, verbose_name='Сид перемешивания'),
+        ),
+    ]
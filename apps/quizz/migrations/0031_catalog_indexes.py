@@ -0,0 +1,33 @@
+# Generated by Django 5.1.3 on 2026-10-18 03:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizz', '0030_usertestanswers_shuffle_seed'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(fields=['parent', 'slug'], name='category_parent_slug_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(condition=models.Q(('parent__isnull', True)), fields=['id'], name='category_top_level_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quiz',
+            index=models.Index(fields=['category', 'mode_of_study', 'year', '-id'], name='quiz_catalog_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quiz',
+            index=models.Index(fields=['mode_of_study', 'year', '-id'], name='quiz_mode_year_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quiz',
+            index=models.Index(fields=['year', '-id'], name='quiz_year_idx'),
+        ),
+    ]
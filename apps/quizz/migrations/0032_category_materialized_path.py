@@ -0,0 +1,52 @@
+# Generated by Django 5.1.3 on 2026-10-18 03:01
+
+from django.db import migrations, models
+
+
+def fill_category_paths(apps, schema_editor):
+    Category = apps.get_model('quizz', 'Category')
+    categories = list(Category.objects.order_by('id'))
+    by_parent = {}
+    for category in categories:
+        by_parent.setdefault(category.parent_id, []).append(category)
+
+    queue = [(category, None) for category in by_parent.get(None, [])]
+    while queue:
+        category, parent = queue.pop()
+        name = category.name or 'Без названия'
+        category.path = f'{parent.path if parent else "/"}{category.pk}/'
+        category.full_name = f'{parent.full_name} / {name}' if parent else name
+        category.depth = parent.depth + 1 if parent else 0
+        queue.extend((child, category) for child in by_parent.get(category.pk, []))
+
+    Category.objects.bulk_update(categories, ['path', 'full_name', 'depth'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizz', '0031_catalog_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='Глубина'),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='full_name',
+            field=models.CharField(default='', editable=False, max_length=1000, verbose_name='Полное название'),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='path',
+            field=models.CharField(default='', editable=False, max_length=255, verbose_name='Путь'),
+        ),
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(fields=['path'], name='category_path_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.RunPython(fill_category_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.1.3 on 2026-10-18 03:02
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+FTS_TABLE = 'quizz_search_fts'
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            "UPDATE quizz_quiz SET search_vector = to_tsvector('simple', COALESCE(title, ''))"
+        )
+        schema_editor.execute(
+            "UPDATE quizz_quizquestion SET search_vector = to_tsvector('simple', COALESCE(title, ''))"
+        )
+        schema_editor.execute(
+            'CREATE INDEX quiz_search_vector_idx ON quizz_quiz USING gin (search_vector)'
+        )
+        schema_editor.execute(
+            'CREATE INDEX quizquestion_search_vector_idx ON quizz_quizquestion USING gin (search_vector)'
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5('
+            f'title, kind UNINDEXED, quiz_id UNINDEXED, object_id UNINDEXED)'
+        )
+        schema_editor.execute(
+            f"INSERT INTO {FTS_TABLE} (title, kind, quiz_id, object_id) "
+            f"SELECT COALESCE(title, ''), 'quiz', id, id FROM quizz_quiz"
+        )
+        schema_editor.execute(
+            f"INSERT INTO {FTS_TABLE} (title, kind, quiz_id, object_id) "
+            f"SELECT COALESCE(title, ''), 'question', quiz_id, id FROM quizz_quizquestion"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+
+    if vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS quiz_search_vector_idx')
+        schema_editor.execute('DROP INDEX IF EXISTS quizquestion_search_vector_idx')
+    elif vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizz', '0032_category_materialized_path'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quiz',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='quizquestion',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.1.3 on 2026-10-18 03:08
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizz', '0033_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file', models.FileField(upload_to='imports/', verbose_name='Файл')),
+                ('status', models.CharField(choices=[('pending', 'В очереди'), ('running', 'Выполняется'), ('done', 'Завершено'), ('failed', 'Ошибка')], default='pending', max_length=10, verbose_name='Статус')),
+                ('questions_parsed', models.PositiveIntegerField(default=0, verbose_name='Разобрано вопросов')),
+                ('questions_inserted', models.PositiveIntegerField(default=0, verbose_name='Добавлено вопросов')),
+                ('error', models.TextField(blank=True, null=True, verbose_name='Ошибка')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Начато')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Завершено')),
+                ('author', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='author_import_jobs', to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+                ('quiz', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='import_jobs', to='quizz.quiz', verbose_name='Викторина')),
+            ],
+            options={
+                'verbose_name': 'Импорт вопросов',
+                'verbose_name_plural': 'Импорт вопросов',
+                'indexes': [models.Index(fields=['status', 'id'], name='importjob_status_idx')],
+            },
+        ),
+    ]
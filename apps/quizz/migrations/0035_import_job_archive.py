@@ -0,0 +1,29 @@
+# Generated by Django 5.1.3 on 2026-10-18 03:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizz', '0034_import_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importjob',
+            name='category',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='import_jobs', to='quizz.category', verbose_name='Категория'),
+        ),
+        migrations.AddField(
+            model_name='importjob',
+            name='kind',
+            field=models.CharField(choices=[('file', 'Файл'), ('archive', 'Архив')], default='file', max_length=10, verbose_name='Тип'),
+        ),
+        migrations.AddField(
+            model_name='importjob',
+            name='report',
+            field=models.JSONField(blank=True, null=True, verbose_name='Отчёт'),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.1.3 on 2026-10-18 03:21
+
+import hashlib
+import re
+
+from django.db import migrations, models
+
+
+# Frozen copy of apps.quizz.parsing.question_fingerprint as of this migration.
+def normalize_text(text):
+    return re.sub(r'\s+', ' ', text or '').strip().casefold()
+
+
+def question_fingerprint(title, options):
+    parts = [normalize_text(title)]
+    parts.extend(sorted(f'{normalize_text(text)}\x1e{int(bool(is_correct))}' for text, is_correct in options))
+    return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+
+def fill_fingerprints(apps, schema_editor):
+    QuizQuestion = apps.get_model('quizz', 'QuizQuestion')
+    QuestionOption = apps.get_model('quizz', 'QuestionOption')
+
+    # Only the first copy of a duplicated question gets the fingerprint, later copies keep NULL.
+    seen = set()
+    last_id = 0
+    while True:
+        questions = list(QuizQuestion.objects.filter(id__gt=last_id).order_by('id')[:1000])
+        if not questions:
+            break
+        last_id = questions[-1].id
+
+        options = {}
+        for question_id, text, is_correct in QuestionOption.objects.filter(
+            question_id__in=[question.id for question in questions]
+        ).values_list('question_id', 'text', 'is_correct'):
+            options.setdefault(question_id, []).append((text, is_correct))
+
+        for question in questions:
+            fingerprint = question_fingerprint(question.title, options.get(question.id, []))
+            if (question.quiz_id, fingerprint) not in seen:
+                seen.add((question.quiz_id, fingerprint))
+                question.fingerprint = fingerprint
+
+        QuizQuestion.objects.bulk_update(questions, ['fingerprint'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizz', '0035_import_job_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizquestion',
+            name='fingerprint',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True, verbose_name='Отпечаток'),
+        ),
+        migrations.RunPython(fill_fingerprints, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='quizquestion',
+            constraint=models.UniqueConstraint(fields=('quiz', 'fingerprint'), name='quizquestion_fingerprint_uniq'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.1.3 on 2026-10-18 03:27
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Least
+
+
+def fill_score_counters(apps, schema_editor):
+    UserTestAnswers = apps.get_model('quizz', 'UserTestAnswers')
+    TestAnswerQuestion = apps.get_model('quizz', 'TestAnswerQuestion')
+    QuizQuestion = apps.get_model('quizz', 'QuizQuestion')
+
+    def count(queryset, field):
+        return Coalesce(Subquery(
+            queryset.order_by().values(field).annotate(count=Count('id')).values('count')
+        ), Value(0))
+
+    answers = TestAnswerQuestion.objects.filter(test_answer_quiz=OuterRef('pk'), selected_answer__isnull=False)
+    UserTestAnswers.objects.update(
+        answered_count=count(answers, 'test_answer_quiz'),
+        correct_count=count(answers.filter(selected_answer__is_correct=True), 'test_answer_quiz'),
+        question_count=Least(Value(25), count(QuizQuestion.objects.filter(quiz=OuterRef('quiz')), 'quiz')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizz', '0036_question_fingerprint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usertestanswers',
+            name='answered_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Отвечено'),
+        ),
+        migrations.AddField(
+            model_name='usertestanswers',
+            name='correct_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Правильных ответов'),
+        ),
+        migrations.AddField(
+            model_name='usertestanswers',
+            name='question_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Количество вопросов'),
+        ),
+        migrations.RunPython(fill_score_counters, migrations.RunPython.noop),
+    ]
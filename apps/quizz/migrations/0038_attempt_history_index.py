@@ -0,0 +1,19 @@
+# Generated by Django 5.1.3 on 2026-10-18 03:29
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizz', '0037_attempt_score_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='usertestanswers',
+            index=models.Index(fields=['author', '-id'], name='usertestanswers_author_idx'),
+        ),
+    ]
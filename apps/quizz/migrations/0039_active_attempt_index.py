@@ -0,0 +1,19 @@
+# Generated by Django 5.1.3 on 2026-10-18 03:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizz', '0038_attempt_history_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='usertestanswers',
+            index=models.Index(condition=models.Q(('is_completed', False)), fields=['updated_at'], name='usertestanswers_active_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.1.3 on 2026-10-18 03:34
+
+from django.db import migrations, models
+
+
+def fill_positions(apps, schema_editor):
+    TestAnswerQuestion = apps.get_model('quizz', 'TestAnswerQuestion')
+
+    # Answers are numbered in creation order within their attempt, which is the order every view created them in.
+    changed = []
+    attempt_id, ordinal = None, 0
+    rows = TestAnswerQuestion.objects.filter(test_answer_quiz__isnull=False).order_by(
+        'test_answer_quiz_id', 'id'
+    ).values_list('id', 'test_answer_quiz_id', 'position').iterator(chunk_size=2000)
+
+    for answer_id, answer_attempt_id, position in rows:
+        ordinal = ordinal + 1 if answer_attempt_id == attempt_id else 1
+        attempt_id = answer_attempt_id
+        if position != ordinal:
+            changed.append(TestAnswerQuestion(id=answer_id, position=ordinal))
+
+    TestAnswerQuestion.objects.bulk_update(changed, ['position'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizz', '0039_active_attempt_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_positions, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='testanswerquestion',
+            constraint=models.UniqueConstraint(fields=('test_answer_quiz', 'position'), name='testanswerquestion_position_uniq'),
+        ),
+    ]
@@ -1,3 +1,7 @@
+import random
+from datetime import timedelta
+
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.utils.translation import gettext as _
 from django.conf import settings
@@ -16,9 +20,22 @@ class Category(models.Model):
     )
     created_at = models.DateField(auto_now_add=True, null=True, blank=True, verbose_name="Дата публикации")
     slug = models.SlugField(max_length=250, unique=True, null=True, blank=True, verbose_name="Слаг")
+    path = models.CharField(max_length=255, default='', editable=False, verbose_name="Путь")
+    full_name = models.CharField(max_length=1000, default='', editable=False, verbose_name="Полное название")
+    depth = models.PositiveSmallIntegerField(default=0, editable=False, verbose_name="Глубина")
     objects = models.Manager()
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['parent', 'slug'], name='category_parent_slug_idx'),
+            models.Index(fields=['id'], name='category_top_level_idx', condition=models.Q(parent__isnull=True)),
+            models.Index(fields=['path'], name='category_path_idx', opclasses=['varchar_pattern_ops']),
+        ]
+
     def __str__(self):
+        if self.full_name:
+            return self.full_name
+
         str_name = self.name or _("Без названия")
         parent = self.parent
 
@@ -29,6 +46,38 @@ class Category(models.Model):
 
         return str_name
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+
+        old_path, old_full_name, old_depth = self.path, self.full_name, self.depth
+        parent = self.parent
+        name = self.name or _("Без названия")
+
+        self.path = f'{parent.path if parent else "/"}{self.pk}/'
+        self.full_name = f'{parent.full_name} / {name}' if parent else name
+        self.depth = parent.depth + 1 if parent else 0
+
+        if (self.path, self.full_name) == (old_path, old_full_name):
+            return
+
+        Category.objects.filter(pk=self.pk).update(path=self.path, full_name=self.full_name, depth=self.depth)
+        if old_path:
+            self.update_descendants(old_path, old_depth)
+
+    def update_descendants(self, old_path, old_depth):
+        full_names = {self.pk: self.full_name}
+        descendants = list(
+            Category.objects.filter(path__startswith=old_path).exclude(pk=self.pk).order_by('depth')
+        )
+
+        for category in descendants:
+            category.path = self.path + category.path[len(old_path):]
+            category.depth = self.depth + category.depth - old_depth
+            category.full_name = f'{full_names[category.parent_id]} / {category.name or _("Без названия")}'
+            full_names[category.pk] = category.full_name
+
+        Category.objects.bulk_update(descendants, ['path', 'full_name', 'depth'])
+
 
 class TopLevelCategory(Category):
     class Meta:
@@ -44,6 +93,28 @@ class SubCategory(Category):
         verbose_name_plural = "2. Направление"
 
 
+class SearchVectorDeferringManager(models.Manager):
+    """
+    Leaves the search_vector column out of loaded rows. Search filters and
+    ranks on it in SQL, nothing else reads it.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().defer('search_vector')
+
+
+class QuizQuerySet(models.QuerySet):
+    def under_category(self, category_path):
+        return self.filter(category__in=Category.objects.filter(path__startswith=category_path).values('id'))
+
+    def with_has_bought(self, user):
+        if not user or not user.is_authenticated:
+            return self.annotate(has_bought=models.Value(False))
+        return self.annotate(
+            has_bought=models.Exists(OrderQuiz.objects.filter(author=user, quiz=models.OuterRef('pk')))
+        )
+
+
 class Quiz(models.Model):
     SEMESTER_CHOICES = [
         ('1', _("I")),
@@ -78,8 +149,9 @@ class Quiz(models.Model):
     category = models.ForeignKey(SubCategory, on_delete=models.CASCADE, null=True, blank=True,
                                  verbose_name="Категория", related_name='category')
     created_at = models.DateTimeField(auto_now_add=True, null=True, blank=True, verbose_name=_("Дата создания"))
+    search_vector = SearchVectorField(null=True, editable=False)
 
-    objects = models.Manager()
+    objects = SearchVectorDeferringManager.from_queryset(QuizQuerySet)()
 
     def __str__(self):
         return self.title
@@ -87,6 +159,11 @@ class Quiz(models.Model):
     class Meta:
         verbose_name = '3. Название теста'
         verbose_name_plural = '3. Название теста'
+        indexes = [
+            models.Index(fields=['category', 'mode_of_study', 'year', '-id'], name='quiz_catalog_idx'),
+            models.Index(fields=['mode_of_study', 'year', '-id'], name='quiz_mode_year_idx'),
+            models.Index(fields=['year', '-id'], name='quiz_year_idx'),
+        ]
 
 
 class UploadTests(models.Model):
@@ -106,6 +183,57 @@ class UploadTests(models.Model):
         verbose_name_plural = '4. Загрузить файл'
 
 
+class ImportJob(models.Model):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    FILE = 'file'
+    ARCHIVE = 'archive'
+
+    KIND_CHOICES = [
+        (FILE, 'Файл'),
+        (ARCHIVE, 'Архив'),
+    ]
+
+    STATUS_CHOICES = [
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Завершено'),
+        (FAILED, 'Ошибка'),
+    ]
+
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name='import_jobs', null=True, blank=True,
+                             verbose_name='Викторина')
+    category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, blank=True,
+                                 verbose_name='Категория', related_name='import_jobs')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, default=FILE, verbose_name='Тип')
+    file = models.FileField(upload_to='imports/', verbose_name='Файл')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING, verbose_name='Статус')
+    questions_parsed = models.PositiveIntegerField(default=0, verbose_name='Разобрано вопросов')
+    questions_inserted = models.PositiveIntegerField(default=0, verbose_name='Добавлено вопросов')
+    error = models.TextField(null=True, blank=True, verbose_name='Ошибка')
+    report = models.JSONField(null=True, blank=True, verbose_name='Отчёт')
+    author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True,
+                               verbose_name="Автор", related_name="author_import_jobs")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name=_("Дата создания"))
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name='Начато')
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name='Завершено')
+
+    objects = models.Manager()
+
+    def __str__(self):
+        return f'{self.id}: {self.file.name} ({self.status})'
+
+    class Meta:
+        verbose_name = 'Импорт вопросов'
+        verbose_name_plural = 'Импорт вопросов'
+        indexes = [
+            models.Index(fields=['status', 'id'], name='importjob_status_idx'),
+        ]
+
+
 class OrderQuiz(models.Model):
     quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name='order_quiz', null=True, blank=True,
                              verbose_name='Викторина')
@@ -129,8 +257,10 @@ class QuizQuestion(models.Model):
     quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, null=True, blank=True,
                              verbose_name="Тест", related_name='test')
     created_at = models.DateTimeField(auto_now_add=True, null=True, blank=True, verbose_name=_("Дата создания"))
+    search_vector = SearchVectorField(null=True, editable=False)
+    fingerprint = models.CharField(max_length=64, null=True, blank=True, editable=False, verbose_name='Отпечаток')
 
-    objects = models.Manager()
+    objects = SearchVectorDeferringManager()
 
     def __str__(self):
         return f'{self.id}: {self.title}'
@@ -138,6 +268,9 @@ class QuizQuestion(models.Model):
     class Meta:
         verbose_name = '3. Тест'
         verbose_name_plural = '3. Тести'
+        constraints = [
+            models.UniqueConstraint(fields=['quiz', 'fingerprint'], name='quizquestion_fingerprint_uniq'),
+        ]
 
 
 class QuestionOption(models.Model):
@@ -158,7 +291,30 @@ class QuestionOption(models.Model):
         verbose_name_plural = 'Варианты ответа'
 
 
+class UserTestAnswersQuerySet(models.QuerySet):
+    def with_results(self, user):
+        """
+        Loads everything the results page renders: the quiz with its category
+        chain and ``has_bought``, and the answers with their selected option.
+        """
+        return self.prefetch_related(
+            models.Prefetch('quiz', queryset=Quiz.objects.select_related('category__parent').with_has_bought(user)),
+            models.Prefetch(
+                'author_test_answer_question',
+                queryset=TestAnswerQuestion.objects.select_related('selected_answer').order_by('id'),
+                to_attr='prefetched_answers'
+            ),
+        )
+
+
+def generate_shuffle_seed():
+    return random.getrandbits(31)
+
+
 class UserTestAnswers(models.Model):
+    QUESTION_COUNT = 25
+    TIME_LIMIT = timedelta(hours=1)
+
     author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, blank=True,
                                verbose_name="Автор", related_name="author_test_answers")
     quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, null=True, blank=True,
@@ -166,8 +322,20 @@ class UserTestAnswers(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, null=True, blank=True, verbose_name=_("Дата создания"))
     updated_at = models.DateTimeField(auto_now=True, null=True, blank=True, verbose_name='Обновлено')
     is_completed = models.BooleanField(default=False, null=True, blank=True, verbose_name='Завершено')
+    shuffle_seed = models.PositiveIntegerField(default=generate_shuffle_seed, null=True, blank=True,
+                                               verbose_name='Сид перемешивания')
+    question_count = models.PositiveIntegerField(default=0, verbose_name='Количество вопросов')
+    answered_count = models.PositiveIntegerField(default=0, verbose_name='Отвечено')
+    correct_count = models.PositiveIntegerField(default=0, verbose_name='Правильных ответов')
 
-    objects = models.Manager()
+    objects = UserTestAnswersQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['author', '-id'], name='usertestanswers_author_idx'),
+            models.Index(fields=['updated_at'], name='usertestanswers_active_idx',
+                         condition=models.Q(is_completed=False)),
+        ]
 
 
 class TestAnswerQuestion(models.Model):
@@ -179,8 +347,14 @@ class TestAnswerQuestion(models.Model):
                                          verbose_name="Тест", related_name='author_test_answer_question')
     selected_answer = models.ForeignKey(
         QuestionOption, on_delete=models.CASCADE, null=True, blank=True, related_name='selected_answer')
+    position = models.PositiveIntegerField(null=True, blank=True, verbose_name='Порядковый номер')
 
     objects = models.Manager()
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['test_answer_quiz', 'position'], name='testanswerquestion_position_uniq'),
+        ]
+
     def __str__(self):
         return f"{self.question}"
\ No newline at end of file
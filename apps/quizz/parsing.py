@@ -0,0 +1,76 @@
+import codecs
+import hashlib
+import re
+import time
+import zipfile
+from collections import namedtuple
+
+FALLBACK_ENCODING = 'ISO-8859-1'
+
+ParsedQuestion = namedtuple('ParsedQuestion', ['title', 'options'])
+
+
+def normalize_text(text):
+    return re.sub(r'\s+', ' ', text or '').strip().casefold()
+
+
+def question_fingerprint(title, options):
+    """
+    sha256 of the normalized title and the sorted ``(text, is_correct)``
+    options, so the same question matches regardless of option order.
+    """
+    parts = [normalize_text(title)]
+    parts.extend(sorted(f'{normalize_text(text)}\x1e{int(bool(is_correct))}' for text, is_correct in options))
+    return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+
+def detect_encoding(file_path, block_size=1024 * 1024):
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    try:
+        with open(file_path, 'rb') as file:
+            for block in iter(lambda: file.read(block_size), b''):
+                decoder.decode(block)
+            decoder.decode(b'', final=True)
+    except UnicodeDecodeError:
+        return FALLBACK_ENCODING
+    return 'utf-8'
+
+
+def decode(data):
+    try:
+        return data.decode('utf-8')
+    except UnicodeDecodeError:
+        return data.decode(FALLBACK_ENCODING)
+
+
+def iter_questions(lines):
+    """
+    Lazily parses the ``#`` question / ``+`` correct / ``-`` wrong option
+    format and yields one ``ParsedQuestion`` at a time.
+    """
+    current = None
+
+    for line in lines:
+        line = line.strip()
+
+        if line.startswith("#"):
+            if current:
+                yield current
+            current = ParsedQuestion(line[1:].strip(), [])
+        elif line.startswith(("+", "-")) and current:
+            current.options.append((line[1:].strip(), line.startswith("+")))
+
+    if current:
+        yield current
+
+
+def parse_archive_member(archive_path, name):
+    """
+    Parses one file of a zip archive. Runs in a worker process, so this
+    module must not import Django models.
+    """
+    started = time.perf_counter()
+    with zipfile.ZipFile(archive_path) as archive:
+        text = decode(archive.read(name))
+    questions = list(iter_questions(text.splitlines()))
+    return name, questions, time.perf_counter() - started
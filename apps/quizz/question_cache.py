@@ -0,0 +1,70 @@
+from uuid import uuid4
+
+from django.core.cache import cache
+
+from apps.quizz.models import QuizQuestion
+
+PAYLOAD_TIMEOUT = 60 * 60 * 24
+
+
+def version_key(question_id):
+    return f'quizz:question:{question_id}:version'
+
+
+def payload_key(question_id, version):
+    return f'quizz:question:{question_id}:{version}'
+
+
+def get_payload_versions(question_ids):
+    """
+    Returns ``{question_id: version}``. A lost version stamp is replaced by a
+    fresh one, which only makes the old payload unreachable.
+    """
+    keys = {version_key(question_id): question_id for question_id in question_ids}
+    versions = {keys[key]: version for key, version in cache.get_many(keys).items()}
+
+    missing = [key for key, question_id in keys.items() if question_id not in versions]
+    if missing:
+        for key in missing:
+            cache.add(key, uuid4().hex, PAYLOAD_TIMEOUT)
+        versions.update({keys[key]: version for key, version in cache.get_many(missing).items()})
+
+    return versions
+
+
+def load_question_payloads(question_ids):
+    payloads = {}
+    rows = QuizQuestion.objects.filter(id__in=question_ids).order_by('id', 'options__id').values_list(
+        'id', 'title', 'options__id', 'options__text', 'options__is_correct'
+    )
+
+    for question_id, title, option_id, text, is_correct in rows:
+        payload = payloads.setdefault(question_id, {'id': question_id, 'title': title, 'options': []})
+        if option_id is not None:
+            payload['options'].append({'id': option_id, 'text': text, 'is_correct': is_correct})
+
+    return payloads
+
+
+def get_question_payloads(question_ids):
+    """
+    Returns ``{question_id: {'id', 'title', 'options'}}`` for the given ids,
+    reading from the cache first and loading all misses with one query.
+    """
+    versions = get_payload_versions(set(question_ids))
+    keys = {payload_key(question_id, version): question_id for question_id, version in versions.items()}
+    payloads = {keys[key]: payload for key, payload in cache.get_many(keys).items()}
+
+    missing = [question_id for question_id in keys.values() if question_id not in payloads]
+    if missing:
+        loaded = load_question_payloads(missing)
+        cache.set_many({
+            payload_key(question_id, versions[question_id]): payload for question_id, payload in loaded.items()
+        }, PAYLOAD_TIMEOUT)
+        payloads.update(loaded)
+
+    return payloads
+
+
+def invalidate_question(question_id):
+    cache.set(version_key(question_id), uuid4().hex, PAYLOAD_TIMEOUT)
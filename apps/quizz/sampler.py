@@ -0,0 +1,67 @@
+import random
+from array import array
+
+from apps.quizz.cache import get_version, bump_version
+from apps.quizz.models import QuizQuestion
+
+
+class QuestionPool:
+    __slots__ = ('version', 'ids')
+
+    def __init__(self, version, ids):
+        self.version = version
+        self.ids = ids
+
+
+class QuestionSampler:
+    """
+    Keeps the question ids of every quiz in a compact array so that random
+    questions can be drawn without ``ORDER BY RANDOM()`` on the database.
+    """
+
+    def __init__(self):
+        self._pools = {}
+
+    @staticmethod
+    def version_key(quiz_id):
+        return f'quizz:sampler:{quiz_id}:version'
+
+    def get_pool(self, quiz_id):
+        version = get_version(self.version_key(quiz_id))
+        pool = self._pools.get(quiz_id)
+
+        if pool is None or pool.version != version:
+            ids = QuizQuestion.objects.filter(quiz_id=quiz_id).order_by().values_list('id', flat=True)
+            pool = QuestionPool(version, array('q', ids))
+            self._pools[quiz_id] = pool
+
+        return pool.ids
+
+    def invalidate(self, quiz_id):
+        bump_version(self.version_key(quiz_id))
+        self._pools.pop(quiz_id, None)
+
+    def count(self, quiz_id):
+        return len(self.get_pool(quiz_id))
+
+    def draw(self, quiz_id, k=1, exclude=()):
+        ids = self.get_pool(quiz_id)
+        exclude = set(exclude)
+        size = len(ids)
+
+        # Rejection sampling stays O(1) per draw while at least half of the
+        # pool is still available; past that point filtering is cheaper.
+        if (len(exclude) + k) * 2 > size:
+            candidates = [question_id for question_id in ids if question_id not in exclude]
+            return random.sample(candidates, min(k, len(candidates)))
+
+        picked = []
+        while len(picked) < k:
+            question_id = ids[random.randrange(size)]
+            if question_id not in exclude:
+                exclude.add(question_id)
+                picked.append(question_id)
+        return picked
+
+
+question_sampler = QuestionSampler()
@@ -0,0 +1,74 @@
+from django.db import transaction
+from django.db.models import F, Subquery
+from django.utils.timezone import now
+
+from apps.quizz.answer_key import get_option_entries
+from apps.quizz.models import UserTestAnswers, TestAnswerQuestion
+
+
+def latest_attempt_id(user, quiz_id):
+    return UserTestAnswers.objects.filter(author=user, quiz_id=quiz_id).order_by('-id').values('id')[:1]
+
+
+def latest_attempt_answers(user, quiz_id, question_ids):
+    """
+    Answer rows of the user's latest attempt of the quiz, locked until the
+    end of the transaction.
+    """
+    return TestAnswerQuestion.objects.select_for_update().filter(
+        test_answer_quiz=Subquery(latest_attempt_id(user, quiz_id)), question_id__in=question_ids
+    )
+
+
+def active_attempt_id(user, quiz_id):
+    return UserTestAnswers.objects.filter(
+        author=user, quiz_id=quiz_id, is_completed=False, updated_at__gte=now() - UserTestAnswers.TIME_LIMIT
+    ).order_by('-id').values('id')[:1]
+
+
+def active_attempt_answers(user, quiz_id, question_ids):
+    """
+    Answer rows of the user's unfinished attempt of the quiz that is still
+    within the time limit, locked until the end of the transaction.
+    """
+    return TestAnswerQuestion.objects.select_for_update().filter(
+        test_answer_quiz=Subquery(active_attempt_id(user, quiz_id)), question_id__in=question_ids
+    )
+
+
+def apply_score_changes(attempt_id, changes):
+    """
+    Moves the attempt counters by the effect of ``(old_option_id,
+    new_option_id)`` answer changes with a single F() update.
+    """
+    changes = [(old, new) for old, new in changes if old != new]
+    if not changes:
+        return
+
+    entries = get_option_entries([option_id for change in changes for option_id in change if option_id])
+
+    def is_correct(option_id):
+        entry = entries.get(option_id)
+        return int(bool(entry and entry[2]))
+
+    answered = sum(1 for old, new in changes if old is None and new is not None)
+    correct = sum(is_correct(new) - is_correct(old) for old, new in changes)
+
+    if answered or correct:
+        UserTestAnswers.objects.filter(pk=attempt_id).update(
+            answered_count=F('answered_count') + answered,
+            correct_count=F('correct_count') + correct,
+        )
+
+
+def record_answer(user, quiz_id, question_id, option_id):
+    with transaction.atomic():
+        row = latest_attempt_answers(user, quiz_id, [question_id]).values_list(
+            'id', 'test_answer_quiz_id', 'selected_answer_id'
+        ).first()
+        if row is None or row[2] == option_id:
+            return
+
+        answer_id, attempt_id, previous_option_id = row
+        TestAnswerQuestion.objects.filter(pk=answer_id).update(selected_answer_id=option_id)
+        apply_score_changes(attempt_id, [(previous_option_id, option_id)])
@@ -0,0 +1,125 @@
+import re
+
+from django.contrib.postgres.search import SearchVector, SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import Q, F, Exists, OuterRef, Subquery, FloatField, Value, Min
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce
+
+from apps.quizz.models import Quiz, QuizQuestion
+
+SEARCH_CONFIG = 'simple'
+FTS_TABLE = 'quizz_search_fts'
+TITLE_WEIGHT = 2
+
+
+def search_backend():
+    return connection.vendor if connection.vendor in ('postgresql', 'sqlite') else None
+
+
+def _postgres_vector():
+    return SearchVector('title', config=SEARCH_CONFIG)
+
+
+def _fts_insert(cursor, kind, rows):
+    cursor.executemany(
+        f'INSERT INTO {FTS_TABLE} (title, kind, quiz_id, object_id) VALUES (%s, %s, %s, %s)',
+        [(title or '', kind, quiz_id, object_id) for object_id, quiz_id, title in rows]
+    )
+
+
+def index_quiz(quiz):
+    backend = search_backend()
+
+    if backend == 'postgresql':
+        Quiz.objects.filter(pk=quiz.pk).update(search_vector=_postgres_vector())
+    elif backend == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE kind = 'quiz' AND object_id = %s", [quiz.pk])
+            _fts_insert(cursor, 'quiz', [(quiz.pk, quiz.pk, quiz.title)])
+
+
+def index_question(question):
+    backend = search_backend()
+
+    if backend == 'postgresql':
+        QuizQuestion.objects.filter(pk=question.pk).update(search_vector=_postgres_vector())
+    elif backend == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE kind = 'question' AND object_id = %s", [question.pk])
+            _fts_insert(cursor, 'question', [(question.pk, question.quiz_id, question.title)])
+
+
+def remove_from_index(kind, object_id):
+    if search_backend() == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE kind = %s AND object_id = %s', [kind, object_id])
+
+
+def reindex_quiz_questions(quiz_id):
+    """
+    Rebuilds the index entries of every question of a quiz. Used after bulk
+    inserts, which do not send post_save.
+    """
+    backend = search_backend()
+
+    if backend == 'postgresql':
+        QuizQuestion.objects.filter(quiz_id=quiz_id).update(search_vector=_postgres_vector())
+    elif backend == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE kind = 'question' AND quiz_id = %s", [quiz_id])
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (title, kind, quiz_id, object_id) "
+                f"SELECT COALESCE(title, ''), 'question', quiz_id, id FROM {QuizQuestion._meta.db_table} "
+                f"WHERE quiz_id = %s",
+                [quiz_id]
+            )
+
+
+def search_quizzes(queryset, text):
+    """
+    Filters ``queryset`` to quizzes whose title or question titles match
+    ``text`` and orders them by relevance.
+    """
+    backend = search_backend()
+
+    if backend == 'postgresql':
+        return _search_postgres(queryset, text)
+    if backend == 'sqlite':
+        return _search_sqlite(queryset, text)
+    return queryset.filter(Q(title__icontains=text) | Q(test__title__icontains=text)).distinct().order_by('-id')
+
+
+def _search_postgres(queryset, text):
+    query = SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+    matching_questions = QuizQuestion.objects.filter(quiz=OuterRef('pk'), search_vector=query)
+    question_rank = matching_questions.annotate(
+        rank=SearchRank(F('search_vector'), query)
+    ).order_by('-rank').values('rank')[:1]
+
+    return queryset.annotate(
+        rank=SearchRank(F('search_vector'), query) * TITLE_WEIGHT
+        + Coalesce(Subquery(question_rank, output_field=FloatField()), Value(0.0))
+    ).filter(
+        Q(search_vector=query) | Exists(matching_questions)
+    ).order_by('-rank', '-id')
+
+
+def _search_sqlite(queryset, text):
+    terms = re.findall(r'\w+', text)
+    if not terms:
+        return queryset.none()
+
+    # Joins the FTS table so that matching, grouping by quiz, ranking and the
+    # paginator's LIMIT/OFFSET run as a single statement. The hidden rank
+    # column is bm25(), which cannot be called inside MIN(); it is negative
+    # and lower means more relevant.
+    match = ' '.join('"{}"'.format(term) for term in terms)
+    rank = RawSQL(
+        f"CASE WHEN {FTS_TABLE}.kind = 'quiz' THEN {FTS_TABLE}.rank * {TITLE_WEIGHT} ELSE {FTS_TABLE}.rank END", []
+    )
+    return queryset.extra(
+        tables=[FTS_TABLE],
+        where=[f'{FTS_TABLE} MATCH %s', f'{FTS_TABLE}.quiz_id = {Quiz._meta.db_table}.id'],
+        params=[match],
+    ).annotate(search_rank=Min(rank)).order_by('search_rank', '-id')
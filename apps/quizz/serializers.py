@@ -1,10 +1,14 @@
+import random
+
+from django.db.models import Manager
 from django.shortcuts import get_object_or_404
 from rest_framework import serializers
 
 from apps.quizz.models import (
     SubCategory, TopLevelCategory, Category,
-    Quiz, QuestionOption, QuestionOption, OrderQuiz, QuizQuestion, TestAnswerQuestion, UserTestAnswers
+    Quiz, QuestionOption, QuestionOption, OrderQuiz, QuizQuestion, TestAnswerQuestion, UserTestAnswers, ImportJob
 )
+from apps.quizz.question_cache import get_question_payloads
 
 
 class SubCategorySerializer(serializers.ModelSerializer):
@@ -31,73 +35,116 @@ class QuizOptionDetailSerializer(serializers.ModelSerializer):
         fields = ['id', 'text', 'is_correct']
 
 
-class QuizQuestionSerializer(serializers.ModelSerializer):
-    option_list = serializers.SerializerMethodField()
+class OptionBatchListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, Manager) else data)
+        self.child.prefetch([self.child.get_question_id(item) for item in items])
+        return super().to_representation(items)
+
+
+class QuestionOptionsMixin:
+    """
+    Reads question payloads (title and options) from the question cache,
+    loading every miss of a ``many=True`` serializer with a single query, and
+    shuffles options in Python. With a ``shuffle_seed`` in the context the
+    option order is derived from the seed and the question id, so an attempt
+    always renders the same order.
+    """
+    option_serializer_class = QuizOptionSerializer
 
     class Meta:
-        model = QuizQuestion
-        fields = ['id', 'title', 'option_list']
+        list_serializer_class = OptionBatchListSerializer
+
+    def get_question_id(self, obj):
+        return obj.id
+
+    def prefetch(self, question_ids):
+        question_payloads = self.context.setdefault('question_payloads', {})
+        missing = [question_id for question_id in question_ids if question_id not in question_payloads]
+        if missing:
+            question_payloads.update(get_question_payloads(missing))
+
+    def get_payload(self, obj):
+        question_id = self.get_question_id(obj)
+        self.prefetch([question_id])
+        return self.context['question_payloads'].get(question_id, {'id': question_id, 'title': None, 'options': []})
+
+    def get_title(self, obj):
+        return self.get_payload(obj)['title']
+
+    def get_options(self, obj):
+        return self.get_payload(obj)['options']
 
     def get_option_list(self, obj):
-        instance = QuestionOption.objects.filter(question=obj).order_by('?')
-        serializer = QuizOptionSerializer(instance, many=True, context={"request": self.context.get('request')})
-        return serializer.data
+        options = list(self.get_options(obj))
+        seed = self.context.get('shuffle_seed')
+        if seed is None:
+            random.shuffle(options)
+        else:
+            random.Random(f'{seed}:{self.get_question_id(obj)}').shuffle(options)
+        return self.option_serializer_class(options, many=True, context=self.context).data
+
 
+class QuizQuestionSerializer(QuestionOptionsMixin, serializers.ModelSerializer):
+    title = serializers.SerializerMethodField()
+    option_list = serializers.SerializerMethodField()
 
-class QuizQuestionRetireSerializer(serializers.ModelSerializer):
+    class Meta(QuestionOptionsMixin.Meta):
+        model = QuizQuestion
+        fields = ['id', 'title', 'option_list']
+
+
+class QuizQuestionRetireSerializer(QuestionOptionsMixin, serializers.ModelSerializer):
     option_list = serializers.SerializerMethodField()
     selected_answer = serializers.SerializerMethodField()
     correct_answer = serializers.SerializerMethodField()
 
-    class Meta:
+    class Meta(QuestionOptionsMixin.Meta):
         model = QuizQuestion
         fields = ['id', 'title', 'selected_answer', 'correct_answer', 'option_list']
 
-    def get_option_list(self, obj):
-        instance = QuestionOption.objects.filter(question=obj).order_by('?')
-        serializer = QuizOptionSerializer(instance, many=True, context={"request": self.context.get('request')})
-        return serializer.data
+    def prefetch(self, question_ids):
+        super().prefetch(question_ids)
 
-    def get_selected_answer(self, obj):
-        existing_test = UserTestAnswers.objects.filter(
-            author=self.context.get('request').user, quiz=obj.quiz
-        ).last()
+        answers_by_question = self.context.setdefault('answers_by_question', {})
+        missing = [question_id for question_id in question_ids if question_id not in answers_by_question]
+        if not missing:
+            return
 
-        if not existing_test:
-            return []
+        existing_test = self.context.get('user_test_answers')
+        if existing_test is None:
+            existing_test = UserTestAnswers.objects.filter(
+                author=self.context.get('request').user,
+                quiz__test__id=missing[0]
+            ).last()
 
-        queryset = TestAnswerQuestion.objects.select_related('test_answer_quiz', 'question').filter(
-            test_answer_quiz=existing_test, question=obj
-        ).values('selected_answer__id')
+        answers = TestAnswerQuestion.objects.select_related('selected_answer').filter(
+            test_answer_quiz=existing_test, question_id__in=missing
+        ) if existing_test else []
 
-        instance = QuestionOption.objects.filter(id__in=queryset)
+        for answer in answers:
+            answers_by_question[answer.question_id] = answer
+        for question_id in missing:
+            answers_by_question.setdefault(question_id, None)
 
-        if not instance.exists():
-            return []
-
-        serializer = QuizOptionSerializer(instance, many=True, context={"request": self.context.get('request')})
-        return serializer.data
+    def get_answer(self, obj):
+        self.prefetch([obj.id])
+        return self.context['answers_by_question'][obj.id]
 
-    def get_correct_answer(self, obj):
-        existing_test = UserTestAnswers.objects.filter(
-            author=self.context.get('request').user, quiz=obj.quiz
-        ).last()
+    def get_selected_answer(self, obj):
+        answer = self.get_answer(obj)
 
-        if not existing_test:
+        if not answer or not answer.selected_answer:
             return []
 
-        queryset = TestAnswerQuestion.objects.select_related('test_answer_quiz', 'question').filter(
-            test_answer_quiz=existing_test, question=obj
-        ).values('question__id')
+        return QuizOptionSerializer([answer.selected_answer], many=True, context=self.context).data
 
-        instance = QuestionOption.objects.select_related('question').filter(
-            question__in=queryset, is_correct=True)
-
-        if not instance.exists():
+    def get_correct_answer(self, obj):
+        if not self.get_answer(obj):
             return []
 
-        serializer = QuizOptionSerializer(instance, many=True, context={"request": self.context.get('request')})
-        return serializer.data
+        instance = [option for option in self.get_options(obj) if option['is_correct']]
+        return QuizOptionSerializer(instance, many=True, context=self.context).data
 
 
 class QuizSerializer(serializers.ModelSerializer):
@@ -113,6 +160,8 @@ class QuizSerializer(serializers.ModelSerializer):
                   'degree', 'created_at', 'has_bought']
 
     def get_has_bought(self, obj):
+        if hasattr(obj, 'has_bought'):
+            return obj.has_bought
         try:
             if OrderQuiz.objects.select_related('author').filter(
                     author=self.context.get('request').user).select_related('quiz').filter(quiz=obj).exists():
@@ -136,22 +185,19 @@ class QuizSerializer(serializers.ModelSerializer):
         return None
 
 
-class TestAnswerQuestionSerializer(serializers.ModelSerializer):
+class TestAnswerQuestionSerializer(QuestionOptionsMixin, serializers.ModelSerializer):
+    option_serializer_class = QuizOptionDetailSerializer
+
     option_list = serializers.SerializerMethodField()
     title = serializers.SerializerMethodField()
     selected_answer = QuizOptionDetailSerializer(read_only=True)
 
-    class Meta:
+    class Meta(QuestionOptionsMixin.Meta):
         model = TestAnswerQuestion
         fields = ['id', 'title', 'selected_answer', 'option_list']
 
-    def get_option_list(self, obj):
-        instance = QuestionOption.objects.select_related('question').filter(question=obj.question).order_by('?')
-        serializer = QuizOptionDetailSerializer(instance, many=True, context={"request": self.context.get('request')})
-        return serializer.data
-
-    def get_title(self, obj):
-        return obj.question.title
+    def get_question_id(self, obj):
+        return obj.question_id
 
 
 class UserTestAnswersListSerializer(serializers.ModelSerializer):
@@ -165,11 +211,13 @@ class UserTestAnswersListSerializer(serializers.ModelSerializer):
         ]
 
     def get_test_list(self, obj):
-        queryset = TestAnswerQuestion.objects.select_related('test_answer_quiz').filter(
-            test_answer_quiz=obj
-        )
+        queryset = getattr(obj, 'prefetched_answers', None)
+        if queryset is None:
+            queryset = TestAnswerQuestion.objects.select_related('selected_answer').filter(
+                test_answer_quiz=obj
+            ).order_by('id')
         serializer = TestAnswerQuestionSerializer(queryset, many=True, context={
-            'request': self.context.get('request')
+            'request': self.context.get('request'), 'shuffle_seed': obj.shuffle_seed
         })
         return serializer.data
 
@@ -177,4 +225,37 @@ class UserTestAnswersListSerializer(serializers.ModelSerializer):
 class TestResultSerializer(serializers.Serializer):
     results = UserTestAnswersListSerializer()
     count_true_answers = serializers.IntegerField()
-    persentage_true_answers = serializers.FloatField()
\ No newline at end of file
+    persentage_true_answers = serializers.FloatField()
+
+
+class AttemptHistorySerializer(serializers.ModelSerializer):
+    quiz_title = serializers.CharField(read_only=True)
+    persentage_true_answers = serializers.SerializerMethodField()
+
+    class Meta:
+        model = UserTestAnswers
+        fields = [
+            'id', 'quiz_id', 'quiz_title', 'created_at', 'is_completed',
+            'question_count', 'answered_count', 'correct_count', 'persentage_true_answers'
+        ]
+
+    def get_persentage_true_answers(self, obj):
+        return obj.correct_count * 100 / obj.question_count if obj.question_count else 0
+
+
+class AnswerSubmissionItemSerializer(serializers.Serializer):
+    question_id = serializers.IntegerField()
+    option_id = serializers.IntegerField()
+
+
+class AnswerSubmissionSerializer(serializers.Serializer):
+    answers = AnswerSubmissionItemSerializer(many=True, allow_empty=False, max_length=500)
+
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ImportJob
+        fields = [
+            'id', 'kind', 'quiz', 'status', 'questions_parsed', 'questions_inserted', 'error', 'report',
+            'created_at', 'started_at', 'finished_at'
+        ]
@@ -0,0 +1,295 @@
+"""
+Write-behind state of in-progress deck tests, kept in the shared cache.
+
+Answers are written back when ``SESSION_FLUSH_BATCH`` are pending or
+``SESSION_FLUSH_INTERVAL`` seconds passed (checked on every touch), when the
+test ends, and by the ``flush_test_sessions`` command for idle sessions, so
+a lost cache entry loses fewer than ``SESSION_FLUSH_BATCH`` answers given
+since the last command run. Needs a cache shared by all workers, which
+``check_shared_cache`` enforces at startup.
+"""
+import time
+from array import array
+from contextlib import contextmanager
+from datetime import timedelta
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Subquery
+from django.utils.timezone import now
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from apps.quizz.models import UserTestAnswers, TestAnswerQuestion
+from apps.quizz.scoring import active_attempt_id, apply_score_changes
+
+SESSION_FLUSH_INTERVAL = 30
+SESSION_FLUSH_BATCH = 10
+SESSION_GRACE = 10 * 60
+SESSION_LOCK_TIMEOUT = 5
+SESSION_LOCK_WAIT = 2
+
+
+def session_key(user_id, quiz_id):
+    return f'quizz:session:{user_id}:{quiz_id}'
+
+
+def user_sessions_key(user_id):
+    return f'quizz:session:{user_id}:quizzes'
+
+
+class ActiveTestSession:
+    __slots__ = (
+        'attempt_id', 'user_id', 'quiz_id', 'shuffle_seed', 'question_ids', 'answer_ids',
+        'answers', 'persisted', 'position', 'deadline', 'flushed_at'
+    )
+
+    def __init__(self, attempt_id, user_id, quiz_id, shuffle_seed, question_ids, answer_ids, answers, deadline):
+        self.attempt_id = attempt_id
+        self.user_id = user_id
+        self.quiz_id = quiz_id
+        self.shuffle_seed = shuffle_seed
+        self.question_ids = array('q', question_ids)
+        self.answer_ids = array('q', answer_ids)
+        self.answers = dict(answers)
+        self.persisted = dict(answers)
+        self.position = 1
+        self.deadline = deadline
+        self.flushed_at = time.time()
+
+    def is_expired(self):
+        return time.time() > self.deadline
+
+    def question_at(self, position):
+        if 1 <= position <= len(self.question_ids):
+            return self.question_ids[position - 1]
+        return None
+
+    def select(self, question_id, option_id):
+        if question_id not in self.question_ids:
+            return False
+        self.answers[question_id] = option_id
+        return True
+
+    def pending(self):
+        return [
+            (answer_id, question_id)
+            for answer_id, question_id in zip(self.answer_ids, self.question_ids)
+            if self.answers.get(question_id) != self.persisted.get(question_id)
+        ]
+
+    def needs_flush(self):
+        pending = len(self.pending())
+        return pending >= SESSION_FLUSH_BATCH or (
+            pending and time.time() - self.flushed_at >= SESSION_FLUSH_INTERVAL
+        )
+
+
+class SessionBusy(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'The test session is busy, retry the request.'
+    default_code = 'session_busy'
+
+
+@contextmanager
+def cache_lock(key):
+    """
+    Holds ``key`` in the shared cache for the duration of the block, or
+    raises SessionBusy after ``SESSION_LOCK_WAIT`` seconds. A lock left by a
+    crashed process expires after ``SESSION_LOCK_TIMEOUT`` seconds, and only
+    the holder's token releases it.
+    """
+    token = uuid4().hex
+    delay = 0.005
+    give_up_at = time.monotonic() + SESSION_LOCK_WAIT
+    while not cache.add(key, token, SESSION_LOCK_TIMEOUT):
+        if time.monotonic() >= give_up_at:
+            raise SessionBusy()
+        time.sleep(delay)
+        delay = min(delay * 2, 0.1)
+    try:
+        yield
+    finally:
+        if cache.get(key) == token:
+            cache.delete(key)
+
+
+def session_lock(user_id, quiz_id):
+    """Serializes read-modify-write of one session between requests and the flush command."""
+    return cache_lock(f'{session_key(user_id, quiz_id)}:lock')
+
+
+def get_session(user_id, quiz_id):
+    return cache.get(session_key(user_id, quiz_id))
+
+
+def save_session(session):
+    timeout = max(int(session.deadline - time.time()), 0) + SESSION_GRACE
+    cache.set(session_key(session.user_id, session.quiz_id), session, timeout)
+
+
+def add_user_session(user_id, quiz_id):
+    with cache_lock(f'{user_sessions_key(user_id)}:lock'):
+        quiz_ids = cache.get(user_sessions_key(user_id), set())
+        quiz_ids.add(quiz_id)
+        cache.set(user_sessions_key(user_id), quiz_ids, None)
+
+
+def remove_user_session(user_id, quiz_id):
+    with cache_lock(f'{user_sessions_key(user_id)}:lock'):
+        quiz_ids = cache.get(user_sessions_key(user_id), set())
+        quiz_ids.discard(quiz_id)
+        cache.set(user_sessions_key(user_id), quiz_ids, None)
+
+
+def start_session(attempt, question_ids, answer_ids, answers=()):
+    session = ActiveTestSession(
+        attempt.id, attempt.author_id, attempt.quiz_id, attempt.shuffle_seed, question_ids, answer_ids, answers,
+        (attempt.updated_at + UserTestAnswers.TIME_LIMIT).timestamp()
+    )
+    save_session(session)
+    add_user_session(attempt.author_id, attempt.quiz_id)
+    return session
+
+
+def load_session(user_id, quiz_id):
+    """
+    Rebuilds the session of the user's unfinished deck attempt from the
+    database with one query, or returns None if there is none within the
+    time limit.
+    """
+    rows = list(TestAnswerQuestion.objects.filter(
+        test_answer_quiz=Subquery(active_attempt_id(user_id, quiz_id))
+    ).select_related('test_answer_quiz').order_by('position'))
+
+    if not rows or any(row.position is None for row in rows):
+        return None
+
+    return start_session(
+        rows[0].test_answer_quiz,
+        [row.question_id for row in rows],
+        [row.id for row in rows],
+        {row.question_id: row.selected_answer_id for row in rows if row.selected_answer_id},
+    )
+
+
+def flush_session(session):
+    """
+    Writes the answers changed since the last flush with one bulk_update and
+    moves the attempt counters accordingly.
+    """
+    pending = session.pending()
+    if pending:
+        with transaction.atomic():
+            TestAnswerQuestion.objects.bulk_update([
+                TestAnswerQuestion(id=answer_id, selected_answer_id=session.answers.get(question_id))
+                for answer_id, question_id in pending
+            ], ['selected_answer'])
+            apply_score_changes(session.attempt_id, [
+                (session.persisted.get(question_id), session.answers.get(question_id))
+                for _, question_id in pending
+            ])
+        session.persisted = dict(session.answers)
+    session.flushed_at = time.time()
+
+
+def _end_session(session):
+    flush_session(session)
+    cache.delete(session_key(session.user_id, session.quiz_id))
+    remove_user_session(session.user_id, session.quiz_id)
+
+
+def end_session(user_id, quiz_id):
+    """
+    Writes back and removes the cached session. Returns the ended session,
+    or None if there was none.
+    """
+    with session_lock(user_id, quiz_id):
+        session = get_session(user_id, quiz_id)
+        if session is not None:
+            _end_session(session)
+        return session
+
+
+def session_question_at(user_id, quiz_id, position):
+    """
+    Moves the active session to ``position`` and returns ``(session,
+    question_id)``. The session is rebuilt from the database when it is not
+    cached; returns None if there is no active deck test.
+    """
+    with session_lock(user_id, quiz_id):
+        session = get_session(user_id, quiz_id)
+        if session is not None and session.is_expired():
+            _end_session(session)
+            return None
+        if session is None:
+            session = load_session(user_id, quiz_id)
+            if session is None:
+                return None
+
+        question_id = session.question_at(position)
+        if question_id is None:
+            return session, None
+
+        session.position = position
+        save_session(session)
+        return session, question_id
+
+
+def record_session_answer(user_id, quiz_id, question_id, option_id):
+    """
+    Records the answer in the active session. Returns False when there is
+    no session for the question, so the caller writes it to the database.
+    """
+    with session_lock(user_id, quiz_id):
+        session = get_session(user_id, quiz_id)
+        if session is None:
+            return False
+        if session.is_expired():
+            _end_session(session)
+            return False
+        if not session.select(question_id, option_id):
+            return False
+
+        if session.needs_flush():
+            flush_session(session)
+        save_session(session)
+        return True
+
+
+def flush_user_sessions(user_id):
+    for quiz_id in cache.get(user_sessions_key(user_id)) or ():
+        with session_lock(user_id, quiz_id):
+            session = get_session(user_id, quiz_id)
+            if session is not None and session.pending():
+                flush_session(session)
+                save_session(session)
+
+
+def flush_all_sessions():
+    """
+    Flushes the sessions of recently active attempts and ends expired ones.
+    Returns the number of sessions that had answers to write.
+    """
+    flushed = 0
+    attempts = UserTestAnswers.objects.filter(
+        is_completed=False, updated_at__gte=now() - UserTestAnswers.TIME_LIMIT - timedelta(seconds=SESSION_GRACE)
+    ).values_list('author_id', 'quiz_id').distinct()
+
+    for user_id, quiz_id in attempts.iterator(chunk_size=2000):
+        try:
+            with session_lock(user_id, quiz_id):
+                session = get_session(user_id, quiz_id)
+                if session is None:
+                    continue
+                flushed += bool(session.pending())
+                if session.is_expired():
+                    _end_session(session)
+                else:
+                    flush_session(session)
+                    save_session(session)
+        except SessionBusy:
+            # The request holding the session writes it back when needed.
+            continue
+    return flushed
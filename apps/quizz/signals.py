@@ -1,40 +1,123 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from apps.quizz.models import UploadTests, QuizQuestion, QuestionOption
+from apps.quizz.answer_key import invalidate_option, invalidate_question_options
+from apps.quizz.category_tree import invalidate_category_tree
+from apps.quizz.import_jobs import enqueue_import
+from apps.quizz.conditional import bump_catalog_version, bump_orders_version
+from apps.quizz.models import (
+    UploadTests, Quiz, QuizQuestion, QuestionOption, Category, TopLevelCategory, SubCategory, OrderQuiz
+)
+from apps.quizz.question_cache import invalidate_question
+from apps.quizz.sampler import question_sampler
+from apps.quizz.search import index_quiz, index_question, remove_from_index
+from apps.quizz.utils import schedule_fingerprint_refresh
 
 
 @receiver(post_save, sender=UploadTests)
 def process_uploaded_file(sender, instance, created, **kwargs):
     if created and instance.file:
-        file_path = instance.file.path
-        try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                lines = file.readlines()
-        except UnicodeDecodeError:
-            with open(file_path, 'r', encoding='ISO-8859-1') as file:
-                lines = file.readlines()
-
-        current_question = None
-
-        for line in lines:
-            line = line.strip()
-
-            if line.startswith("#"):
-                current_question = QuizQuestion.objects.create(
-                    title=line[1:].strip(),
-                    quiz=instance.quiz,
-                )
-            elif line.startswith("+"):
-                if current_question:
-                    QuestionOption.objects.create(
-                        question=current_question,
-                        text=line[1:].strip(),
-                        is_correct=True,
-                    )
-            elif line.startswith("-"):
-                if current_question:
-                    QuestionOption.objects.create(
-                        question=current_question,
-                        text=line[1:].strip(),
-                        is_correct=False,
-                    )
+        enqueue_import(instance.file.name, instance.quiz, instance.author)
+
+
+@receiver(post_save, sender=QuizQuestion)
+@receiver(post_delete, sender=QuizQuestion)
+def invalidate_question_pool(sender, instance, **kwargs):
+    quiz_id = instance.quiz_id
+    if quiz_id:
+        transaction.on_commit(lambda: question_sampler.invalidate(quiz_id))
+
+
+@receiver(post_save, sender=QuizQuestion)
+@receiver(post_delete, sender=QuizQuestion)
+def invalidate_question_payload(sender, instance, **kwargs):
+    question_id = instance.id
+    transaction.on_commit(lambda: invalidate_question(question_id))
+
+
+@receiver(post_save, sender=QuestionOption)
+@receiver(post_delete, sender=QuestionOption)
+def invalidate_option_question_payload(sender, instance, **kwargs):
+    question_id = instance.question_id
+    if question_id:
+        transaction.on_commit(lambda: invalidate_question(question_id))
+
+
+@receiver(post_save, sender=QuizQuestion)
+def invalidate_question_answer_key(sender, instance, created, **kwargs):
+    question_id = instance.id
+    if not created:
+        transaction.on_commit(lambda: invalidate_question_options(question_id))
+
+
+@receiver(post_save, sender=QuestionOption)
+@receiver(post_delete, sender=QuestionOption)
+def invalidate_option_answer_key(sender, instance, **kwargs):
+    option_id = instance.id
+    transaction.on_commit(lambda: invalidate_option(option_id))
+
+
+@receiver(post_save, sender=QuizQuestion)
+def update_question_fingerprint(sender, instance, **kwargs):
+    schedule_fingerprint_refresh(instance.id)
+
+
+@receiver(post_save, sender=QuestionOption)
+@receiver(post_delete, sender=QuestionOption)
+def update_option_question_fingerprint(sender, instance, origin=None, **kwargs):
+    # Options deleted in a question or quiz cascade leave nothing to refresh.
+    if isinstance(origin, QuerySet):
+        origin = origin.model
+    elif origin is not None:
+        origin = type(origin)
+    if origin not in (None, QuestionOption):
+        return
+
+    if instance.question_id:
+        schedule_fingerprint_refresh(instance.question_id)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=TopLevelCategory)
+@receiver(post_save, sender=SubCategory)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=TopLevelCategory)
+@receiver(post_delete, sender=SubCategory)
+def invalidate_category_snapshot(sender, instance, **kwargs):
+    transaction.on_commit(invalidate_category_tree)
+    transaction.on_commit(bump_catalog_version)
+
+
+@receiver(post_save, sender=Quiz)
+def index_quiz_for_search(sender, instance, **kwargs):
+    index_quiz(instance)
+
+
+@receiver(post_delete, sender=Quiz)
+def remove_quiz_from_search(sender, instance, **kwargs):
+    remove_from_index('quiz', instance.id)
+
+
+@receiver(post_save, sender=QuizQuestion)
+def index_question_for_search(sender, instance, **kwargs):
+    index_question(instance)
+
+
+@receiver(post_delete, sender=QuizQuestion)
+def remove_question_from_search(sender, instance, **kwargs):
+    remove_from_index('question', instance.id)
+
+
+@receiver(post_save, sender=Quiz)
+@receiver(post_delete, sender=Quiz)
+def advance_catalog_version(sender, instance, **kwargs):
+    transaction.on_commit(bump_catalog_version)
+
+
+@receiver(post_save, sender=OrderQuiz)
+@receiver(post_delete, sender=OrderQuiz)
+def advance_orders_version(sender, instance, **kwargs):
+    author_id = instance.author_id
+    if author_id:
+        transaction.on_commit(lambda: bump_orders_version(author_id))
@@ -1,3 +1,839 @@
-from django.test import TestCase
+import io
+import json
+import tempfile
+import zipfile
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.account.models import CustomUser
+from apps.quizz.archive_import import import_archive
+from apps.quizz.import_jobs import claim_jobs, run_import_job
+from apps.quizz.models import (
+    Category, Quiz, OrderQuiz, QuizQuestion, QuestionOption, ImportJob, UserTestAnswers, TestAnswerQuestion
+)
+from apps.quizz.parsing import iter_questions
+from apps.quizz.question_cache import get_question_payloads
+from apps.quizz.sampler import question_sampler
+from apps.quizz.serializers import QuizQuestionSerializer
+from apps.quizz.sessions import cache_lock, get_session, save_session, session_key
+from apps.quizz.utils import import_questions, refresh_pending_fingerprints
+
+
+class QuestionSamplerTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.quiz = Quiz.objects.create(title='Quiz')
+        import_questions(self.quiz, iter_questions(
+            line for number in range(30) for line in (f'# Question {number}?', '+ right')
+        ))
+        self.question_ids = set(self.quiz.test.values_list('id', flat=True))
+
+    def test_draw_never_repeats_and_skips_excluded(self):
+        for k in (5, 20, 30):
+            drawn = question_sampler.draw(self.quiz.id, k=k)
+            self.assertEqual(len(drawn), k)
+            self.assertEqual(set(drawn), set(drawn) & self.question_ids)
+            self.assertEqual(len(set(drawn)), k)
+
+        excluded = sorted(self.question_ids)[:10]
+        self.assertFalse(set(question_sampler.draw(self.quiz.id, k=5, exclude=excluded)) & set(excluded))
+
+        remaining = self.question_ids - set(sorted(self.question_ids)[:25])
+        self.assertEqual(set(question_sampler.draw(self.quiz.id, k=10, exclude=sorted(self.question_ids)[:25])),
+                         remaining)
+
+    def test_pool_is_refreshed_after_commit(self):
+        question_sampler.draw(self.quiz.id)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            QuizQuestion.objects.create(quiz=self.quiz, title='New question')
+            self.assertEqual(question_sampler.count(self.quiz.id), 30)
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(question_sampler.count(self.quiz.id), 31)
+
+
+class DeckStartTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(phone='998900000009', username='deck', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        self.quiz = Quiz.objects.create(title='Quiz')
+        OrderQuiz.objects.create(quiz=self.quiz, author=self.user)
+        import_questions(self.quiz, iter_questions(
+            line for number in range(30) for line in (f'# Question {number}?', '+ right', '- wrong')
+        ))
+
+    def test_deck_is_drawn_with_positions(self):
+        response = self.client.get(reverse('start-test', args=[self.quiz.id]), {'start': 'true', 'deck': 'true'})
+        self.assertEqual(response.data['position'], 1)
+
+        rows = list(TestAnswerQuestion.objects.filter(test_answer_quiz__author=self.user).order_by('position'))
+        self.assertEqual([row.position for row in rows], list(range(1, UserTestAnswers.QUESTION_COUNT + 1)))
+        self.assertEqual(len({row.question_id for row in rows}), UserTestAnswers.QUESTION_COUNT)
+        self.assertEqual(response.data['test_list'][0]['id'], rows[0].question_id)
+
+        response = self.client.get(reverse('start-test', args=[self.quiz.id]), {'next': 'true', 'position': 1})
+        self.assertEqual(response.data['test_list'][0]['id'], rows[1].question_id)
+
+
+class QuestionSerializerTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.quiz = Quiz.objects.create(title='Quiz')
+        import_questions(self.quiz, iter_questions(
+            line for number in range(30) for line in (f'# Question {number}?', '+ right', '- wrong', '- other')
+        ))
+
+    def test_option_rendering_query_count_does_not_depend_on_size(self):
+        for size in (5, 30):
+            cache.clear()
+            # Questions, then one query for all their options.
+            with self.assertNumQueries(2):
+                data = QuizQuestionSerializer(self.quiz.test.order_by('id')[:size], many=True).data
+            self.assertEqual(len(data), size)
+            self.assertTrue(all(len(question['option_list']) == 3 for question in data))
+
+    def test_payload_is_invalidated_after_edit_commits(self):
+        question = self.quiz.test.order_by('id').first()
+        option = question.options.get(text='wrong')
+        get_question_payloads([question.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            question.title = 'Edited?'
+            question.save()
+            option.is_correct = True
+            option.save()
+            self.assertEqual(get_question_payloads([question.id])[question.id]['title'], 'Question 0?')
+
+        with self.assertNumQueries(1):
+            payload = get_question_payloads([question.id])[question.id]
+        self.assertEqual(payload['title'], 'Edited?')
+        self.assertEqual([option['text'] for option in payload['options'] if option['is_correct']],
+                         ['right', 'wrong'])
+
+
+class SeededShuffleTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(phone='998900000010', username='shuffle', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        self.quiz = Quiz.objects.create(title='Quiz')
+        OrderQuiz.objects.create(quiz=self.quiz, author=self.user)
+        import_questions(self.quiz, iter_questions(
+            ['# Question?', '+ a', '- b', '- c', '- d', '- e', '- f', '- g', '- h']
+        ))
+
+    def start(self, **headers):
+        return self.client.get(reverse('start-test', args=[self.quiz.id]), {'start': 'true'}, **headers)
+
+    def test_attempt_keeps_option_order_and_answers_not_modified(self):
+        def option_order(response):
+            return [option['id'] for option in response.data['test_list'][0]['option_list']]
+
+        first = self.start()
+        repeated = self.start()
+        self.assertEqual(option_order(first), option_order(repeated))
+
+        response = self.start(HTTP_IF_NONE_MATCH=repeated['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], repeated['ETag'])
+
+
+class QuizListViewTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(phone='998900000001', username='student', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        degree = Category.objects.create(name='Degree', slug='degree')
+        field = Category.objects.create(name='Field', slug='field', parent=degree)
+        self.quizzes = [
+            Quiz.objects.create(title=f'Quiz {number}', category_id=field.id, year='1', mode_of_study='daytime')
+            for number in range(30)
+        ]
+        OrderQuiz.objects.create(quiz=self.quizzes[0], author=self.user)
+
+    def test_query_count_does_not_depend_on_page_size(self):
+        with self.assertNumQueries(2):
+            small_page = self.client.get(reverse('quizs'), {'page_size': 5})
+        with self.assertNumQueries(2):
+            full_page = self.client.get(reverse('quizs'), {'page_size': 100})
+
+        self.assertEqual(len(small_page.data['results']), 5)
+        self.assertEqual(len(full_page.data['results']), 30)
+
+    def test_has_bought_and_degree(self):
+        response = self.client.get(reverse('quizs'), {'page_size': 100})
+
+        bought = {row['id']: row['has_bought'] for row in response.data['results']}
+        self.assertTrue(bought[self.quizzes[0].id])
+        self.assertFalse(bought[self.quizzes[1].id])
+        self.assertEqual(response.data['results'][0]['degree']['slug'], 'degree')
+
+    def test_cursor_pagination_skips_count(self):
+        with self.assertNumQueries(1):
+            first_page = self.client.get(reverse('quizs'), {'pagination': 'cursor', 'page_size': 20})
+
+        self.assertNotIn('count', first_page.data)
+        self.assertEqual([row['id'] for row in first_page.data['results']],
+                         [quiz.id for quiz in reversed(self.quizzes)][:20])
+
+        second_page = self.client.get(first_page.data['next'])
+        self.assertEqual([row['id'] for row in second_page.data['results']],
+                         [quiz.id for quiz in reversed(self.quizzes)][20:])
+        self.assertIsNone(second_page.data['next'])
+
+
+class CategoryPathTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.bachelor = Category.objects.create(name='Bachelor', slug='bachelor')
+        self.master = Category.objects.create(name='Master', slug='master')
+        self.field = Category.objects.create(name='Field', slug='field', parent=self.bachelor)
+        self.topic = Category.objects.create(name='Topic', slug='topic', parent=self.field)
+        self.quiz = Quiz.objects.create(title='Quiz', category_id=self.topic.id)
+
+    def test_subtree_move_updates_path_full_name_and_depth(self):
+        self.field.parent = self.master
+        self.field.save()
+
+        self.topic.refresh_from_db()
+        self.assertEqual(self.topic.path, f'/{self.master.id}/{self.field.id}/{self.topic.id}/')
+        self.assertEqual(self.topic.full_name, 'Master / Field / Topic')
+        self.assertEqual(self.topic.depth, 2)
+        self.assertEqual(str(self.topic), 'Master / Field / Topic')
+
+    def test_degree_filter_covers_the_whole_subtree(self):
+        response = self.client.get(reverse('quizs'), {'degree': 'bachelor'})
+        self.assertEqual([row['id'] for row in response.data['results']], [self.quiz.id])
+
+        response = self.client.get(reverse('quizs'), {'degree': 'master'})
+        self.assertEqual(response.data['results'], [])
+
+
+class QuizSearchViewTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.algebra = Quiz.objects.create(title='Linear algebra')
+        self.history = Quiz.objects.create(title='World history')
+        QuizQuestion.objects.create(quiz=self.history, title='When did the algebra of Al-Khwarizmi appear?')
+        Quiz.objects.create(title='Biology')
+
+    def test_matches_quiz_and_question_titles_ranked_by_title_first(self):
+        response = self.client.get(reverse('quiz-search'), {'q': 'algebra'})
+
+        self.assertEqual([row['id'] for row in response.data['results']], [self.algebra.id, self.history.id])
+
+    def test_common_term_is_paged_in_one_query(self):
+        for number in range(30):
+            quiz = Quiz.objects.create(title=f'Quiz {number}')
+            QuizQuestion.objects.create(quiz=quiz, title='A common question')
+            QuizQuestion.objects.create(quiz=quiz, title='Another common question')
+
+        with self.assertNumQueries(1):
+            first_page = self.client.get(reverse('quiz-search'), {'q': 'common', 'page_size': 20})
+        second_page = self.client.get(first_page.data['next'])
+
+        ids = [row['id'] for row in first_page.data['results'] + second_page.data['results']]
+        self.assertEqual(len(ids), 30)
+        self.assertEqual(len(set(ids)), 30)
+        self.assertIsNone(second_page.data['next'])
+
+    def test_search_vector_is_not_loaded(self):
+        question = self.history.test.get()
+        self.assertIn('search_vector', Quiz.objects.get(pk=self.algebra.pk).get_deferred_fields())
+        self.assertIn('search_vector', question.get_deferred_fields())
+
+    def test_index_follows_updates_and_deletes(self):
+        self.algebra.title = 'Geometry'
+        self.algebra.save()
+        self.history.delete()
+
+        response = self.client.get(reverse('quiz-search'), {'q': 'algebra'})
+        self.assertEqual(response.data['results'], [])
+
+
+class CatalogConditionalGetTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        Category.objects.create(name='Degree', slug='degree')
+
+    def test_unchanged_catalog_answers_not_modified(self):
+        response = self.client.get(reverse('fileds'))
+        self.assertEqual(response.status_code, 200)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('fileds'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_category_change_advances_etag(self):
+        etag = self.client.get(reverse('fileds'))['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name='Another degree', slug='another-degree')
+
+        response = self.client.get(reverse('fileds'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 2)
+
+
+class CatalogBundleTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        degree = Category.objects.create(name='Degree', slug='degree')
+        self.field = Category.objects.create(name='Field', slug='field', parent=degree)
+        self.quiz = Quiz.objects.create(title='First', category_id=self.field.id)
+
+    def quiz_ids(self, response):
+        return [quiz['id'] for quiz in response.json()['degrees'][0]['fields'][0]['quizzes']]
+
+    def test_bundle_is_cached_and_rebuilt_after_catalog_change(self):
+        self.assertEqual(self.quiz_ids(self.client.get(reverse('catalog-bundle'))), [self.quiz.id])
+
+        with self.assertNumQueries(0):
+            self.client.get(reverse('catalog-bundle'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second = Quiz.objects.create(title='Second', category_id=self.field.id)
+
+        response = self.client.get(reverse('catalog-bundle'))
+        self.assertEqual(self.quiz_ids(response), [second.id, self.quiz.id])
+
+
+class ImportQuestionsTest(TestCase):
+    def test_failure_in_a_later_chunk_rolls_back_earlier_chunks(self):
+        quiz = Quiz.objects.create(title='Import')
+
+        def broken_file():
+            for number in range(5):
+                yield from (f'# Question {number}?', '+ right', '- wrong')
+            raise UnicodeDecodeError('utf-8', b'\xff', 0, 1, 'invalid start byte')
+
+        with self.assertRaises(UnicodeDecodeError):
+            import_questions(quiz, iter_questions(broken_file()), chunk_size=2)
+
+        self.assertFalse(QuizQuestion.objects.filter(quiz=quiz).exists())
+        self.assertFalse(QuestionOption.objects.filter(question__quiz=quiz).exists())
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ImportJobTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = CustomUser.objects.create_user(
+            phone='998900000010', username='importer', password='secret', is_staff=True
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.quiz = Quiz.objects.create(title='Import')
+
+    def upload(self, content):
+        file = SimpleUploadedFile('bank.txt', content.encode('utf-8'), content_type='text/plain')
+        response = self.client.post(reverse('upload-test-file'), {'file': file, 'quiz_id': self.quiz.id})
+        self.assertEqual(response.status_code, 202)
+        return response.data['job_id']
+
+    def test_upload_is_queued_and_imported_by_worker(self):
+        job_id = self.upload('# First?\n+ yes\n- no\n# Second?\n- no\n+ yes\n')
+        self.assertEqual(QuizQuestion.objects.filter(quiz=self.quiz).count(), 0)
+
+        self.assertEqual(claim_jobs(5), [job_id])
+        self.assertEqual(claim_jobs(5), [])
+        run_import_job(job_id)
+
+        response = self.client.get(reverse('import-job-detail', args=[job_id]))
+        self.assertEqual(response.data['status'], ImportJob.DONE)
+        self.assertEqual(response.data['questions_parsed'], 2)
+        self.assertEqual(response.data['questions_inserted'], 2)
+        self.assertEqual(QuizQuestion.objects.filter(quiz=self.quiz).count(), 2)
+
+    def test_requires_admin(self):
+        job_id = self.upload('# First?\n+ yes\n')
+        user = CustomUser.objects.create_user(phone='998900000011', username='student', password='secret')
+
+        anonymous, student = APIClient(), APIClient()
+        student.force_authenticate(user)
+        for client in (anonymous, student):
+            file = SimpleUploadedFile('bank.txt', b'# Second?\n+ yes\n', content_type='text/plain')
+            response = client.post(reverse('upload-test-file'), {'file': file, 'quiz_id': self.quiz.id})
+            self.assertIn(response.status_code, (401, 403))
+            response = client.get(reverse('import-job-detail', args=[job_id]))
+            self.assertIn(response.status_code, (401, 403))
+        self.assertEqual(ImportJob.objects.count(), 1)
+
+    def test_failed_import_reports_error(self):
+        job_id = self.upload('# First?\n+ yes\n')
+        ImportJob.objects.filter(pk=job_id).update(quiz=None)
+        claim_jobs(1)
+        run_import_job(job_id)
+
+        job = ImportJob.objects.get(pk=job_id)
+        self.assertEqual(job.status, ImportJob.FAILED)
+        self.assertTrue(job.error)
+
+
+class ArchiveImportTest(TestCase):
+    def test_files_are_mapped_by_manifest_and_file_name(self):
+        degree = Category.objects.create(name='Degree', slug='degree')
+        field = Category.objects.create(name='Field', slug='field', parent=degree)
+        existing = Quiz.objects.create(title='Existing')
+
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as archive:
+            archive.writestr('manifest.json', json.dumps({'first.txt': existing.id}))
+            archive.writestr('first.txt', '# One?\n+ yes\n- no\n')
+            archive.writestr('bank/Algebra.txt', '# Two?\n+ yes\n# Three?\n+ yes\n')
+            archive.writestr('notes.md', 'ignored')
+
+        with tempfile.NamedTemporaryFile(suffix='.zip') as file:
+            file.write(buffer.getvalue())
+            file.flush()
+            report = import_archive(file.name, default_category=field, workers=2)
+
+        self.assertEqual(report['questions_inserted'], 3)
+        self.assertEqual([entry['file'] for entry in report['files']], ['bank/Algebra.txt', 'first.txt'])
+        self.assertEqual(existing.test.count(), 1)
+        self.assertEqual(Quiz.objects.get(title='Algebra', category_id=field.id).test.count(), 2)
+
+
+class QuestionFingerprintTest(TestCase):
+    def test_reimport_skips_existing_and_repeated_questions(self):
+        quiz = Quiz.objects.create(title='Bank')
+        lines = '# One?\n+ yes\n- no\n# Two?\n+ yes\n- no\n'.splitlines()
+        self.assertEqual(import_questions(quiz, iter_questions(lines)), 2)
+
+        corrected = '# one? \n- no\n+ yes\n# Two?\n+ no\n- yes\n# Two?\n+ no\n- yes\n'.splitlines()
+        self.assertEqual(import_questions(quiz, iter_questions(corrected)), 1)
+        self.assertEqual(quiz.test.count(), 3)
+
+    def test_edit_refreshes_fingerprint(self):
+        quiz = Quiz.objects.create(title='Bank')
+        import_questions(quiz, iter_questions('# One?\n+ yes\n'.splitlines()))
+        question = quiz.test.get()
+        fingerprint = question.fingerprint
+
+        with self.captureOnCommitCallbacks(execute=True):
+            QuestionOption.objects.create(question=question, text='no', is_correct=False)
+        question.refresh_from_db()
+        self.assertNotEqual(question.fingerprint, fingerprint)
+        self.assertEqual(import_questions(quiz, iter_questions('# One?\n+ yes\n- no\n'.splitlines())), 0)
+
+    def test_refresh_runs_once_per_question(self):
+        quiz = Quiz.objects.create(title='Bank')
+        import_questions(quiz, iter_questions('# One?\n+ yes\n- no\n'.splitlines()))
+        question = quiz.test.get()
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            for text in ('maybe', 'never', 'always'):
+                QuestionOption.objects.create(question=question, text=text, is_correct=False)
+        with self.assertNumQueries(4):
+            for callback in callbacks:
+                if callback is refresh_pending_fingerprints:
+                    callback()
+
+    def test_cascade_delete_skips_refresh(self):
+        quiz = Quiz.objects.create(title='Bank')
+        import_questions(quiz, iter_questions('# One?\n+ yes\n- no\n# Two?\n+ yes\n- no\n'.splitlines()))
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            quiz.delete()
+        self.assertNotIn(refresh_pending_fingerprints, callbacks)
+
+
+class QuizExportViewTest(TestCase):
+    def setUp(self):
+        self.quiz = Quiz.objects.create(title='Bank')
+        import_questions(self.quiz, iter_questions('# One?\n+ yes\n- no\n# Two?\n- no\n+ yes\n'.splitlines()))
+        self.admin = CustomUser.objects.create_user(
+            phone='998900000009', username='admin', password='secret', is_staff=True
+        )
+        self.client = APIClient()
+
+    def test_requires_admin(self):
+        response = self.client.get(reverse('quiz-export', args=[self.quiz.id]))
+        self.assertIn(response.status_code, (401, 403))
+
+    def test_txt_export_round_trips_through_the_importer(self):
+        self.client.force_authenticate(self.admin)
+        response = self.client.get(reverse('quiz-export', args=[self.quiz.id]))
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content).decode('utf-8')
+
+        copy = Quiz.objects.create(title='Copy')
+        self.assertEqual(import_questions(copy, iter_questions(content.splitlines())), 2)
+        self.assertEqual(
+            set(copy.test.values_list('fingerprint', flat=True)),
+            set(self.quiz.test.values_list('fingerprint', flat=True)),
+        )
+
+    def test_jsonl_export(self):
+        self.client.force_authenticate(self.admin)
+        response = self.client.get(reverse('quiz-export', args=[self.quiz.id]), {'export_format': 'jsonl'})
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode('utf-8').splitlines()]
+        self.assertEqual([row['title'] for row in rows], ['One?', 'Two?'])
+        self.assertEqual(rows[1]['options'], [{'text': 'no', 'is_correct': False}, {'text': 'yes', 'is_correct': True}])
+
+
+class CheckQuizViewTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(phone='998900000002', username='grader', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        self.quiz = Quiz.objects.create(title='Quiz')
+        self.question = QuizQuestion.objects.create(quiz=self.quiz, title='Question')
+        self.right = QuestionOption.objects.create(question=self.question, text='right', is_correct=True)
+        self.wrong = QuestionOption.objects.create(question=self.question, text='wrong', is_correct=False)
+        attempt = UserTestAnswers.objects.create(author=self.user, quiz=self.quiz)
+        self.answer = TestAnswerQuestion.objects.create(question=self.question, test_answer_quiz=attempt, position=1)
+
+    def test_grading_from_warm_answer_key_only_writes(self):
+        self.client.get(reverse('check-quiz', args=[self.wrong.id]))
+        self.client.get(reverse('check-quiz', args=[self.right.id]))
+
+        # Savepoint, locked read of the answer row, answer update, counter update, release.
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse('check-quiz', args=[self.wrong.id]))
+        self.assertEqual(response.data, {'msg': False, 'true_answer': [{'id': self.right.id, 'text': 'right'}]})
+
+        self.client.get(reverse('check-quiz', args=[self.right.id]))
+        self.answer.refresh_from_db()
+        self.assertEqual(self.answer.selected_answer_id, self.right.id)
+        attempt = self.answer.test_answer_quiz
+        attempt.refresh_from_db()
+        self.assertEqual((attempt.answered_count, attempt.correct_count), (1, 1))
+
+    def test_option_change_invalidates_answer_key(self):
+        self.client.get(reverse('check-quiz', args=[self.wrong.id]))
+        self.wrong.is_correct = True
+        with self.captureOnCommitCallbacks(execute=True):
+            self.wrong.save()
+
+        response = self.client.get(reverse('check-quiz', args=[self.wrong.id]))
+        self.assertEqual(response.data, {'msg': True})
+
+
+class SubmitAnswersViewTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(phone='998900000003', username='batch', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        self.quiz = Quiz.objects.create(title='Quiz')
+        attempt = UserTestAnswers.objects.create(author=self.user, quiz=self.quiz)
+        self.options = []
+        for position in range(1, 11):
+            question = QuizQuestion.objects.create(quiz=self.quiz, title=f'Question {position}')
+            right = QuestionOption.objects.create(question=question, text='right', is_correct=True)
+            wrong = QuestionOption.objects.create(question=question, text='wrong', is_correct=False)
+            TestAnswerQuestion.objects.create(question=question, test_answer_quiz=attempt, position=position)
+            self.options.append((question.id, right.id, wrong.id))
+
+    def submit(self, answers):
+        return self.client.post(reverse('submit-answers', args=[self.quiz.id]), {'answers': answers}, format='json')
+
+    def test_records_all_answers_in_one_update(self):
+        answers = [
+            {'question_id': question_id, 'option_id': right_id if number % 2 else wrong_id}
+            for number, (question_id, right_id, wrong_id) in enumerate(self.options)
+        ]
+        flipped = [
+            {'question_id': question_id, 'option_id': wrong_id if number % 2 else right_id}
+            for number, (question_id, right_id, wrong_id) in enumerate(self.options)
+        ]
+        self.submit(flipped[:4])
+        self.submit(answers)
+
+        # Savepoint, locked read of the answer rows, bulk update, counter update, release.
+        with self.assertNumQueries(5):
+            response = self.submit(flipped)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['correct'], 5)
+        self.assertEqual(response.data['results'][0]['correct_option_ids'], [self.options[0][1]])
+        self.assertEqual(
+            dict(TestAnswerQuestion.objects.values_list('question_id', 'selected_answer_id')),
+            {answer['question_id']: answer['option_id'] for answer in flipped},
+        )
+        attempt = UserTestAnswers.objects.get()
+        self.assertEqual((attempt.answered_count, attempt.correct_count), (10, 5))
+
+    def test_option_of_another_question_is_rejected(self):
+        (first_id, first_right, _), (second_id, second_right, _) = self.options[:2]
+        response = self.submit([
+            {'question_id': first_id, 'option_id': first_right},
+            {'question_id': second_id, 'option_id': first_right},
+        ])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['question_ids'], [second_id])
+        self.assertFalse(TestAnswerQuestion.objects.filter(selected_answer__isnull=False).exists())
+
+    def test_finished_or_expired_attempt_is_rejected(self):
+        question_id, right_id, _ = self.options[0]
+        attempt = UserTestAnswers.objects.get()
+
+        attempt.is_completed = True
+        attempt.save()
+        self.assertEqual(self.submit([{'question_id': question_id, 'option_id': right_id}]).status_code, 400)
+
+        UserTestAnswers.objects.filter(pk=attempt.pk).update(
+            is_completed=False, updated_at=attempt.updated_at - UserTestAnswers.TIME_LIMIT * 2
+        )
+        self.assertEqual(self.submit([{'question_id': question_id, 'option_id': right_id}]).status_code, 400)
+        self.assertFalse(TestAnswerQuestion.objects.filter(selected_answer__isnull=False).exists())
+
+
+class FinishTestAuthorTest(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(phone='998900000004', username='finisher', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        degree = Category.objects.create(name='Degree', slug='degree')
+        field = Category.objects.create(name='Field', slug='field', parent=degree)
+        self.quiz = Quiz.objects.create(title='Quiz', category_id=field.id)
+        OrderQuiz.objects.create(quiz=self.quiz, author=self.user)
+
+    def create_attempt(self, size):
+        import_questions(self.quiz, iter_questions(
+            line for number in range(size) for line in (f'# Question {number}?', '+ right', '- wrong', '- other')
+        ))
+        attempt = UserTestAnswers.objects.create(author=self.user, quiz=self.quiz, question_count=size)
+        options = QuestionOption.objects.filter(question__quiz=self.quiz, text__in=['right', 'wrong'])
+        selected = {}
+        for option in options.order_by('id'):
+            selected.setdefault(option.question_id, option)
+        TestAnswerQuestion.objects.bulk_create([
+            TestAnswerQuestion(question_id=question_id, test_answer_quiz=attempt, selected_answer=option,
+                               position=position)
+            for position, (question_id, option) in enumerate(selected.items(), start=1)
+        ])
+        return attempt
+
+    def assert_results_query_count(self, size):
+        self.create_attempt(size)
+        cache.clear()
+
+        # Attempt, quiz with category chain and has_bought, answers with selected options, question payloads.
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('finish-quiz'))
+
+        self.assertEqual(len(response.data['results']['test_list']), size)
+        self.assertTrue(response.data['results']['quiz']['has_bought'])
+        self.assertEqual(response.data['results']['quiz']['degree']['slug'], 'degree')
+
+    def test_query_count_for_25_questions(self):
+        self.assert_results_query_count(25)
+
+    def test_query_count_for_200_questions(self):
+        self.assert_results_query_count(200)
+
+
+class TestSessionTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(phone='998900000007', username='session', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        self.quiz = Quiz.objects.create(title='Quiz')
+        OrderQuiz.objects.create(quiz=self.quiz, author=self.user)
+        import_questions(self.quiz, iter_questions(
+            line for number in range(30) for line in (f'# Question {number}?', '+ right', '- wrong')
+        ))
+
+    def start_deck(self):
+        response = self.client.get(reverse('start-test', args=[self.quiz.id]), {'start': 'true', 'deck': 'true'})
+        self.assertEqual(response.status_code, 200)
+        attempt = UserTestAnswers.objects.get(author=self.user, quiz=self.quiz)
+        options = QuestionOption.objects.filter(question__test_answer_question__test_answer_quiz=attempt)
+        return attempt, options
+
+    def test_answers_are_written_behind(self):
+        attempt, options = self.start_deck()
+        right = list(options.filter(is_correct=True).order_by('id')[:3])
+        wrong = options.filter(is_correct=False).exclude(question__options__in=right).first()
+        for option in right + [wrong]:
+            self.client.get(reverse('check-quiz', args=[option.id]))
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('check-quiz', args=[right[0].id]))
+        self.assertEqual(response.data, {'msg': True})
+        self.assertFalse(attempt.author_test_answer_question.filter(selected_answer__isnull=False).exists())
+
+        response = self.client.get(reverse('finish-quiz'))
+        self.assertEqual(response.data['count_true_answers'], 3)
+        attempt.refresh_from_db()
+        self.assertEqual((attempt.answered_count, attempt.correct_count), (4, 3))
+
+    def test_flush_command_persists_idle_sessions(self):
+        attempt, options = self.start_deck()
+        option = options.filter(is_correct=True).first()
+        self.client.get(reverse('check-quiz', args=[option.id]))
+
+        call_command('flush_test_sessions', stdout=io.StringIO())
+
+        self.assertEqual(attempt.author_test_answer_question.get(selected_answer__isnull=False).selected_answer_id, option.id)
+        attempt.refresh_from_db()
+        self.assertEqual(attempt.correct_count, 1)
+
+    def test_submit_keeps_session_answers(self):
+        attempt, options = self.start_deck()
+        first, second = options.filter(is_correct=True).order_by('id')[:2]
+        self.client.get(reverse('check-quiz', args=[first.id]))
+
+        response = self.client.post(reverse('submit-answers', args=[self.quiz.id]), {'answers': [
+            {'question_id': second.question_id, 'option_id': second.id},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        attempt.refresh_from_db()
+        self.assertEqual((attempt.answered_count, attempt.correct_count), (2, 2))
+
+    def test_busy_session_returns_conflict(self):
+        attempt, options = self.start_deck()
+        cache.set(f'{session_key(self.user.id, self.quiz.id)}:lock', 'other', 60)
+
+        with mock.patch('apps.quizz.sessions.SESSION_LOCK_WAIT', 0):
+            response = self.client.get(reverse('check-quiz', args=[options.first().id]))
+        self.assertEqual(response.status_code, 409)
+
+    def test_lock_is_released_only_by_its_holder(self):
+        with cache_lock('quizz:test-lock'):
+            cache.set('quizz:test-lock', 'other', 60)
+        self.assertEqual(cache.get('quizz:test-lock'), 'other')
+
+    def test_expired_attempt_is_not_rebuilt(self):
+        attempt, _ = self.start_deck()
+        UserTestAnswers.objects.filter(pk=attempt.pk).update(
+            updated_at=attempt.updated_at - UserTestAnswers.TIME_LIMIT * 2
+        )
+        session = get_session(self.user.id, self.quiz.id)
+        session.deadline = 0
+        save_session(session)
+
+        for _ in range(2):
+            response = self.client.get(reverse('start-test', args=[self.quiz.id]), {'next': 'true', 'position': 1})
+            self.assertEqual(response.status_code, 404)
+
+    def test_history_and_answer_detail_include_session_answers(self):
+        attempt, options = self.start_deck()
+        option = options.filter(is_correct=True).first()
+        self.client.get(reverse('check-quiz', args=[option.id]))
+
+        response = self.client.get(reverse('attempt-history'))
+        self.assertEqual(response.data['results'][0]['correct_count'], 1)
+
+        answer = attempt.author_test_answer_question.get(question_id=option.question_id)
+        response = self.client.get(reverse('question-detail', args=[answer.id]))
+        self.assertEqual(response.data['selected_answer']['id'], option.id)
+
+    def test_navigation_rebuilds_a_lost_session(self):
+        self.start_deck()
+        cache.clear()
+
+        response = self.client.get(reverse('start-test', args=[self.quiz.id]), {'next': 'true', 'position': 1})
+        self.assertEqual(response.data['position'], 2)
+        self.assertEqual(len(response.data['test_list'][0]['option_list']), 2)
+
+
+class BackNavigationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(phone='998900000008', username='navigator', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        self.quiz = Quiz.objects.create(title='Quiz')
+        OrderQuiz.objects.create(quiz=self.quiz, author=self.user)
+        import_questions(self.quiz, iter_questions(
+            line for number in range(3) for line in (f'# Question {number}?', '+ right', '- wrong')
+        ))
+        self.client.get(reverse('start-test', args=[self.quiz.id]), {'start': 'true'})
+
+    def back(self, question_id):
+        return self.client.get(reverse('start-test', args=[self.quiz.id]), {'back': 'true', 'question_id': question_id})
+
+    def test_previous_question_is_one_indexed_lookup(self):
+        first = TestAnswerQuestion.objects.get(test_answer_quiz__author=self.user)
+        self.client.get(reverse('start-test', args=[self.quiz.id]), {'next': 'true', 'question_id': first.question_id})
+        second = TestAnswerQuestion.objects.get(test_answer_quiz__author=self.user, position=2)
+        wrong = first.question.options.get(is_correct=False)
+        right = first.question.options.get(is_correct=True)
+        self.client.get(reverse('check-quiz', args=[wrong.id]))
+        self.back(second.question_id)
+
+        # Quiz, purchase check, current and previous answer rows with the attempt and selected option.
+        with self.assertNumQueries(3):
+            response = self.back(second.question_id)
+
+        self.assertEqual(response.data['test_list']['id'], first.question_id)
+        self.assertEqual(response.data['select_answer'], [{'id': wrong.id, 'text': 'wrong'}])
+        self.assertEqual(response.data['true_answer'], [{'id': right.id, 'text': 'right'}])
+        self.assertEqual(self.back(first.question_id).data['test_list'], [])
+        self.assertEqual(self.back(10 ** 6).status_code, 404)
+
+    def test_next_after_deleted_question_appends_after_last_position(self):
+        for position in (1, 2):
+            current = TestAnswerQuestion.objects.get(test_answer_quiz__author=self.user, position=position)
+            self.client.get(reverse('start-test', args=[self.quiz.id]), {'next': 'true', 'question_id': current.question_id})
+        last = TestAnswerQuestion.objects.get(test_answer_quiz__author=self.user, position=3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            TestAnswerQuestion.objects.get(test_answer_quiz__author=self.user, position=2).question.delete()
+            QuizQuestion.objects.create(quiz=self.quiz, title='Question 3?')
+
+        response = self.client.get(reverse('start-test', args=[self.quiz.id]), {'next': 'true', 'question_id': last.question_id})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            list(TestAnswerQuestion.objects.filter(test_answer_quiz__author=self.user).order_by('position')
+                 .values_list('position', flat=True)),
+            [1, 3, 4],
+        )
+
+
+class AttemptHistoryViewTest(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(phone='998900000005', username='history', password='secret')
+        other = CustomUser.objects.create_user(phone='998900000006', username='other', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        quiz = Quiz.objects.create(title='Quiz')
+        UserTestAnswers.objects.bulk_create([
+            UserTestAnswers(author=self.user, quiz=quiz, question_count=25, correct_count=number % 26)
+            for number in range(45)
+        ] + [UserTestAnswers(author=other, quiz=quiz)])
+
+    def test_pages_newest_first_in_one_query_each(self):
+        seen = []
+        url = reverse('attempt-history')
+        while url:
+            with self.assertNumQueries(1):
+                response = self.client.get(url)
+            seen.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+
+        expected = list(UserTestAnswers.objects.filter(author=self.user).order_by('-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+        first = self.client.get(reverse('attempt-history'), {'page_size': 1}).data['results'][0]
+        self.assertEqual(first['quiz_title'], 'Quiz')
+        self.assertEqual(first['persentage_true_answers'], 44 % 26 * 100 / 25)
@@ -1,16 +1,25 @@
 from django.urls import path
 
 from apps.quizz.views import TopLevelCategoryAPIView, RandomQuizzesView, CheckQuizView, UploadTestFileView, \
-    SubCategoryAPIView, GetQuizChoicesView, QuizListView, StartTestView, FinishTestAuthor, BackQuestionDetailView
+    SubCategoryAPIView, GetQuizChoicesView, QuizListView, StartTestView, FinishTestAuthor, BackQuestionDetailView, \
+    QuizSearchView, CatalogBundleView, ImportJobDetailView, QuizExportView, \
+    SubmitAnswersView, AttemptHistoryView
 
 urlpatterns = [
     path('degree/', TopLevelCategoryAPIView.as_view(), name='fileds'),
     path('field/<int:id>/', SubCategoryAPIView.as_view(), name='sub-fields'),
     path('quizz-choices/', GetQuizChoicesView.as_view(), name='get-quiz-choices'),
+    path('catalog/', CatalogBundleView.as_view(), name='catalog-bundle'),
     path('all/', QuizListView.as_view(), name='quizs'),
+    path('search/', QuizSearchView.as_view(), name='quiz-search'),
     path('random-quizzes/<int:quizz_id>/', RandomQuizzesView.as_view(), name='random-quizzes'),
     path('start-test/<int:quizz_id>/', StartTestView.as_view(), name="start-test"),
     path('check-quizz/<int:option_id>/', CheckQuizView.as_view(), name='check-quiz'),
+    path('submit-answers/<int:quizz_id>/', SubmitAnswersView.as_view(), name='submit-answers'),
     path('get-quizz-details/', FinishTestAuthor.as_view(), name='finish-quiz'),
+    path('history/', AttemptHistoryView.as_view(), name='attempt-history'),
+    path('export/<int:quizz_id>/', QuizExportView.as_view(), name='quiz-export'),
+    path('upload-tests/', UploadTestFileView.as_view(), name='upload-test-file'),
+    path('import-jobs/<int:job_id>/', ImportJobDetailView.as_view(), name='import-job-detail'),
     path('quiz/question/<int:quizz_id>/', BackQuestionDetailView.as_view(), name='question-detail'),
 ]
@@ -1,33 +1,110 @@
-import re
-from apps.quizz.models import Quiz, QuestionOption, QuizQuestion
-
-
-def import_tests_from_file(file_path, category):
-    try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            content = file.read()
-    except UnicodeDecodeError:
-        with open(file_path, 'r', encoding='ISO-8859-1') as file:
-            content = file.read()
-
-    tests = content.strip().split('#')[1:]
-
-    for test in tests:
-        lines = test.strip().split('\n')
-        title = lines[0].strip()
-        answers = lines[1:]
-
-        quiz = QuizQuestion.objects.create(
-            title=title,
-            category=category,
-            description="Imported from file"
-        )
-
-        for answer in answers:
-            text = answer[1:].strip()
-            is_correct = answer.startswith('+')
-            QuestionOption.objects.create(
-                quiz=quiz,
-                text=text,
-                is_correct=is_correct
-            )
+from itertools import islice
+
+from django.db import transaction
+
+from apps.quizz.models import QuestionOption, QuizQuestion
+from apps.quizz.parsing import detect_encoding, iter_questions, question_fingerprint
+from apps.quizz.sampler import question_sampler
+from apps.quizz.search import reindex_quiz_questions
+
+IMPORT_CHUNK_SIZE = 1000
+# Options per multi-row INSERT statement.
+OPTION_BATCH_SIZE = 2000
+
+
+def iter_chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def import_questions(quiz, parsed_questions, chunk_size=IMPORT_CHUNK_SIZE, progress=None):
+    """
+    Inserts parsed questions and their options in chunks with ``bulk_create``
+    inside a single transaction, so a failed import leaves nothing behind.
+    Questions whose fingerprint is already in the quiz, or earlier in the
+    same file, are skipped. ``progress(parsed, inserted)`` is called after
+    every chunk. Returns the number of imported questions.
+    """
+    parsed = imported = 0
+    seen = set()
+
+    with transaction.atomic():
+        for chunk in iter_chunks(parsed_questions, chunk_size):
+            fingerprints = [question_fingerprint(item.title, item.options) for item in chunk]
+            seen.update(QuizQuestion.objects.filter(
+                quiz=quiz, fingerprint__in=set(fingerprints) - seen
+            ).values_list('fingerprint', flat=True))
+
+            new_items = []
+            for item, fingerprint in zip(chunk, fingerprints):
+                if fingerprint not in seen:
+                    seen.add(fingerprint)
+                    new_items.append((item, fingerprint))
+
+            questions = QuizQuestion.objects.bulk_create([
+                QuizQuestion(quiz=quiz, title=item.title, fingerprint=fingerprint)
+                for item, fingerprint in new_items
+            ])
+            QuestionOption.objects.bulk_create([
+                QuestionOption(question_id=question.id, text=text, is_correct=is_correct)
+                for question, (item, _) in zip(questions, new_items)
+                for text, is_correct in item.options
+            ], batch_size=OPTION_BATCH_SIZE)
+
+            parsed += len(chunk)
+            imported += len(questions)
+            if progress:
+                progress(parsed, imported)
+
+        # bulk_create does not send post_save, so refresh what the signals would.
+        reindex_quiz_questions(quiz.id)
+        transaction.on_commit(lambda: question_sampler.invalidate(quiz.id))
+
+    return imported
+
+
+def import_tests_from_file(file_path, quiz, chunk_size=IMPORT_CHUNK_SIZE, progress=None):
+    with open(file_path, 'r', encoding=detect_encoding(file_path)) as file:
+        return import_questions(quiz, iter_questions(file), chunk_size=chunk_size, progress=progress)
+
+
+def refresh_question_fingerprint(question_id):
+    """
+    Recomputes the fingerprint after an edit. If the edit made the question
+    identical to another one of the quiz, the fingerprint is cleared instead
+    of failing the save on the unique constraint.
+    """
+    question = QuizQuestion.objects.filter(pk=question_id).values('quiz_id', 'title').first()
+    if question is None:
+        return
+
+    options = QuestionOption.objects.filter(question_id=question_id).values_list('text', 'is_correct')
+    fingerprint = question_fingerprint(question['title'], options)
+    taken = QuizQuestion.objects.filter(
+        quiz_id=question['quiz_id'], fingerprint=fingerprint
+    ).exclude(pk=question_id).exists()
+    QuizQuestion.objects.filter(pk=question_id).update(fingerprint=None if taken else fingerprint)
+
+
+def refresh_pending_fingerprints():
+    connection = transaction.get_connection()
+    question_ids = getattr(connection, 'quizz_pending_fingerprints', set())
+    connection.quizz_pending_fingerprints = set()
+    for question_id in question_ids:
+        refresh_question_fingerprint(question_id)
+
+
+def schedule_fingerprint_refresh(question_id):
+    """
+    Refreshes the fingerprint after commit. Ids are collected on the
+    connection and the first callback to run refreshes each of them once,
+    so later callbacks of the same transaction find nothing left to do.
+    Ids left over from a rolled back transaction are refreshed with the next
+    commit, which leaves their fingerprint unchanged.
+    """
+    connection = transaction.get_connection()
+    if not hasattr(connection, 'quizz_pending_fingerprints'):
+        connection.quizz_pending_fingerprints = set()
+    connection.quizz_pending_fingerprints.add(question_id)
+    transaction.on_commit(refresh_pending_fingerprints)
@@ -1,26 +1,40 @@
-from django.db.models import Count
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Subquery
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+from django.views.decorators.vary import vary_on_headers
 from django.shortcuts import get_object_or_404
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from rest_framework.parsers import MultiPartParser, FormParser
-from django.core.files.storage import default_storage
 from apps.quizz.models import (
-    SubCategory, TopLevelCategory, UserTestAnswers,
-    Quiz, QuestionOption, QuizQuestion, OrderQuiz, TestAnswerQuestion
+    SubCategory, UserTestAnswers,
+    Quiz, QuizQuestion, OrderQuiz, TestAnswerQuestion, ImportJob
 )
 import os
-from django.conf import settings
 from django.utils.timezone import now
-from datetime import timedelta
-from apps.quizz.pagination import QuizPagination
+from apps.quizz.answer_key import get_option_entry, get_option_entries, get_correct_options, get_correct_option_ids
+from apps.quizz.catalog import quiz_choices, get_catalog_bundle
+from apps.quizz.category_tree import get_category_tree
+from apps.quizz.conditional import conditional_response, catalog_etag, catalog_last_modified, quiz_list_etag
+from apps.quizz.export import EXPORT_FORMATS, iter_export
+from apps.quizz.filters import filter_quizzes
+from apps.quizz.pagination import QuizPagination, QuizCursorPagination, QuizSearchPagination, \
+    AttemptHistoryPagination
+from apps.quizz.sampler import question_sampler
+from apps.quizz.scoring import record_answer, latest_attempt_id, active_attempt_answers, apply_score_changes
+from apps.quizz.search import search_quizzes
+from apps.quizz.sessions import start_session, end_session, session_question_at, record_session_answer, \
+    flush_user_sessions
 from apps.quizz.serializers import TopLevelCategorySerializer, QuizSerializer, SubCategorySerializer, \
     QuizQuestionSerializer, TestAnswerQuestionSerializer, UserTestAnswersListSerializer, TestResultSerializer, \
-    QuizQuestionRetireSerializer
-from apps.quizz.utils import import_tests_from_file
+    QuizQuestionRetireSerializer, ImportJobSerializer, AnswerSubmissionSerializer, AttemptHistorySerializer
+from apps.quizz.import_jobs import enqueue_import, enqueue_archive_import
 
 
 class TopLevelCategoryAPIView(APIView):
@@ -32,10 +46,9 @@ class TopLevelCategoryAPIView(APIView):
         operation_description="Get all top-level categories with subcategories.",
         responses={200: TopLevelCategorySerializer(many=True)},
     )
+    @method_decorator(condition(etag_func=catalog_etag, last_modified_func=catalog_last_modified))
     def get(self, request, *args, **kwargs):
-        categories = TopLevelCategory.objects.select_related('parent').filter(
-            parent__isnull=True
-        )
+        categories = get_category_tree().top_level()
         serializer = TopLevelCategorySerializer(categories, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -49,12 +62,13 @@ class SubCategoryAPIView(APIView):
         operation_description="Get all top-level categories with subcategories.",
         responses={200: TopLevelCategorySerializer(many=True)},
     )
+    @method_decorator(condition(etag_func=catalog_etag, last_modified_func=catalog_last_modified))
     def get(self, request, *args, **kwargs):
-        instance = get_object_or_404(TopLevelCategory, id=kwargs.get('id'))
+        category_tree = get_category_tree()
+        if kwargs.get('id') not in category_tree.nodes:
+            raise Http404
 
-        categories = SubCategory.objects.select_related('parent').filter(
-            parent=instance
-        )
+        categories = category_tree.subcategories(kwargs.get('id'))
         serializer = SubCategorySerializer(categories, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -71,12 +85,28 @@ class GetQuizChoicesView(APIView):
             )
         }
     )
+    @method_decorator(condition(etag_func=catalog_etag, last_modified_func=catalog_last_modified))
     def get(self, request, *args, **kwargs):
-        data = {
-            "year_choices": [{"id": choice[0], "label": choice[1]} for choice in Quiz.YEAR_CHOICES],
-            "mode_of_study_choices": [{"id": choice[0], "label": choice[1]} for choice in Quiz.MODE_OF_STUDY_CHOICES],
+        return Response(quiz_choices(), status=status.HTTP_200_OK)
+
+
+class CatalogBundleView(APIView):
+    permission_classes = [AllowAny]
+
+    @swagger_auto_schema(
+        tags=['Quiz'],
+        operation_summary="Get the whole catalog in one response",
+        operation_description="Returns degrees with their fields and quiz summaries, plus year and mode of study "
+                              "choices. The response is precomputed and rebuilt only when the catalog changes.",
+        responses={
+            status.HTTP_200_OK: openapi.Response(
+                description="Catalog bundle",
+            )
         }
-        return Response(data, status=status.HTTP_200_OK)
+    )
+    @method_decorator(condition(etag_func=catalog_etag, last_modified_func=catalog_last_modified))
+    def get(self, request, *args, **kwargs):
+        return HttpResponse(get_catalog_bundle(), content_type='application/json')
 
 
 class QuizListView(APIView):
@@ -94,29 +124,57 @@ class QuizListView(APIView):
             openapi.Parameter('field', openapi.IN_QUERY, description="Filter by field name", type=openapi.TYPE_STRING),
             openapi.Parameter('degree', openapi.IN_QUERY, description="Filter by degree name",
                               type=openapi.TYPE_STRING),
+            openapi.Parameter('pagination', openapi.IN_QUERY,
+                              description="Pass 'cursor' for cursor pagination without a total count",
+                              type=openapi.TYPE_STRING),
         ],
         responses={200: QuizSerializer(many=True)},
     )
+    @method_decorator(vary_on_headers('Authorization'))
+    @method_decorator(condition(etag_func=quiz_list_etag))
     def get(self, request, *args, **kwargs):
-        queryset = Quiz.objects.all().order_by('-id')
+        queryset = Quiz.objects.select_related('category__parent').with_has_bought(request.user).order_by('-id')
+        queryset = filter_quizzes(queryset, request.query_params)
 
-        mode_of_study = request.query_params.get('mode_of_study')
-        if mode_of_study:
-            queryset = queryset.filter(mode_of_study=mode_of_study)
+        if request.query_params.get('pagination') == 'cursor':
+            paginator = QuizCursorPagination()
+        else:
+            paginator = QuizPagination()
+        paginated_queryset = paginator.paginate_queryset(queryset, request)
 
-        year = request.query_params.get('year')
-        if year:
-            queryset = queryset.filter(year=year)
+        serializer = QuizSerializer(paginated_queryset, many=True, context={'request': request})
+        return paginator.get_paginated_response(serializer.data)
 
-        sub_category = request.query_params.get('field')
-        if sub_category:
-            queryset = queryset.filter(category__slug=sub_category)
 
-        top_level_category = request.query_params.get('degree')
-        if top_level_category:
-            queryset = queryset.filter(category__parent__slug=top_level_category)
+class QuizSearchView(APIView):
+    permission_classes = [AllowAny]
 
-        paginator = QuizPagination()
+    @swagger_auto_schema(
+        tags=['Quiz'],
+        operation_summary="Search quizzes",
+        operation_description="Full-text search over quiz titles and question titles, ordered by relevance. "
+                              "Accepts the same filters as the quiz list.",
+        manual_parameters=[
+            openapi.Parameter('q', openapi.IN_QUERY, description="Search text", type=openapi.TYPE_STRING,
+                              required=True),
+            openapi.Parameter('mode_of_study', openapi.IN_QUERY, description="Filter by mode of study",
+                              type=openapi.TYPE_STRING),
+            openapi.Parameter('year', openapi.IN_QUERY, description="Filter by year", type=openapi.TYPE_STRING),
+            openapi.Parameter('field', openapi.IN_QUERY, description="Filter by field name", type=openapi.TYPE_STRING),
+            openapi.Parameter('degree', openapi.IN_QUERY, description="Filter by degree name",
+                              type=openapi.TYPE_STRING),
+        ],
+        responses={200: QuizSerializer(many=True)},
+    )
+    def get(self, request, *args, **kwargs):
+        text = request.query_params.get('q', '').strip()
+        if not text:
+            return Response({"detail": "Search text is required."}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = Quiz.objects.select_related('category__parent').with_has_bought(request.user)
+        queryset = search_quizzes(filter_quizzes(queryset, request.query_params), text)
+
+        paginator = QuizSearchPagination()
         paginated_queryset = paginator.paginate_queryset(queryset, request)
 
         serializer = QuizSerializer(paginated_queryset, many=True, context={'request': request})
@@ -211,6 +269,21 @@ class StartTestView(APIView):
                 type=openapi.TYPE_BOOLEAN,
                 required=False
             ),
+            openapi.Parameter(
+                'deck',
+                openapi.IN_QUERY,
+                description="Together with 'start': draw the whole test paper up front.",
+                type=openapi.TYPE_BOOLEAN,
+                required=False
+            ),
+            openapi.Parameter(
+                'position',
+                openapi.IN_QUERY,
+                description="Position of the current question in a test started with 'deck'. "
+                            "Used with 'next' and 'back'.",
+                type=openapi.TYPE_INTEGER,
+                required=False
+            ),
         ],
     )
     def get(self, request, *args, **kwargs):
@@ -221,12 +294,30 @@ class StartTestView(APIView):
         backward = request.query_params.get('back', False)
         question_id = request.query_params.get('question_id', False)
         reset = request.query_params.get('reset', False)
+        deck = request.query_params.get('deck', False)
+        position = request.query_params.get('position', False)
 
         if OrderQuiz.objects.select_related('quiz').filter(quiz=quiz).exists():
 
+            if start and deck:
+                return self.start_deck(quiz, request)
+
             if start:
                 return self.start(quiz, request)
 
+            if (forward or backward) and position:
+                try:
+                    position = int(position)
+                except ValueError:
+                    return Response({"detail": "Position must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+                return self.question_at(quiz, request, position + 1 if forward else position - 1)
+
+            if question_id:
+                try:
+                    question_id = int(question_id)
+                except ValueError:
+                    return Response({"detail": "Question id must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+
             if forward:
                 return self.forward(quiz, request, question_id)
 
@@ -241,51 +332,114 @@ class StartTestView(APIView):
             status=status.HTTP_400_BAD_REQUEST
         )
 
-    def start(self, quiz, request):
-        TIME_LIMIT = timedelta(hours=1)
+    TIME_LIMIT = UserTestAnswers.TIME_LIMIT
+
+    def create_attempt(self, quiz, request):
+        return UserTestAnswers.objects.create(
+            author=request.user,
+            quiz=quiz,
+            is_completed=False,
+            question_count=min(UserTestAnswers.QUESTION_COUNT, question_sampler.count(quiz.id))
+        )
 
+    def start(self, quiz, request):
+        end_session(request.user.id, quiz.id)
         existing_test = UserTestAnswers.objects.filter(
             author=request.user, quiz=quiz
         ).last()
 
         if existing_test:
-            if not existing_test.is_completed and now() - existing_test.updated_at <= TIME_LIMIT:
-                existing_questions = TestAnswerQuestion.objects.filter(
-                    test_answer_quiz=existing_test
-                )
-                serialized_questions = [
-                    QuizQuestionRetireSerializer(question.question, context={'request': request}).data
-                    for question in existing_questions
-                ]
-                return Response({
+            if not existing_test.is_completed and now() - existing_test.updated_at <= self.TIME_LIMIT:
+                existing_questions = QuizQuestion.objects.filter(
+                    test_answer_question__test_answer_quiz=existing_test
+                ).order_by('test_answer_question__id')
+                serializer = QuizQuestionRetireSerializer(existing_questions, many=True, context={
+                    'request': request, 'user_test_answers': existing_test,
+                    'shuffle_seed': existing_test.shuffle_seed
+                })
+                return conditional_response(request, {
                     "quizz": quiz.title,
-                    "test_list": serialized_questions
-                }, status=status.HTTP_200_OK)
+                    "test_list": serializer.data
+                })
             existing_test.is_completed = True
             existing_test.save()
 
-        quiz_questions = QuizQuestion.objects.filter(quiz=quiz).order_by('?')[:1]
+        quiz_questions = QuizQuestion.objects.filter(id__in=question_sampler.draw(quiz.id))
 
-        create_test_answers = UserTestAnswers.objects.create(
-            author=request.user,
-            quiz=quiz,
-            is_completed=False
-        )
+        create_test_answers = self.create_attempt(quiz, request)
 
-        for question in quiz_questions:
+        for position, question in enumerate(quiz_questions, start=1):
             TestAnswerQuestion.objects.create(
                 question=question,
-                test_answer_quiz=create_test_answers
+                test_answer_quiz=create_test_answers,
+                position=position
             )
 
-        serializer = QuizQuestionSerializer(quiz_questions, many=True, context={'request': request})
-        return Response({
+        serializer = QuizQuestionSerializer(quiz_questions, many=True, context={
+            'request': request, 'shuffle_seed': create_test_answers.shuffle_seed
+        })
+        return conditional_response(request, {
             "quizz": quiz.title,
             "test_list": serializer.data
-        }, status=status.HTTP_200_OK)
+        })
+
+    def start_deck(self, quiz, request):
+        existing_test = UserTestAnswers.objects.filter(
+            author=request.user, quiz=quiz
+        ).last()
+
+        if existing_test:
+            if not existing_test.is_completed and now() - existing_test.updated_at <= self.TIME_LIMIT:
+                return self.question_at(quiz, request, 1)
+            end_session(request.user.id, quiz.id)
+            existing_test.is_completed = True
+            existing_test.save()
+
+        question_ids = question_sampler.draw(quiz.id, k=UserTestAnswers.QUESTION_COUNT)
+        if not question_ids:
+            return Response({
+                "detail": "No questions available in the quiz."
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        create_test_answers = self.create_attempt(quiz, request)
+        answers = TestAnswerQuestion.objects.bulk_create([
+            TestAnswerQuestion(question_id=question_id, test_answer_quiz=create_test_answers, position=position)
+            for position, question_id in enumerate(question_ids, start=1)
+        ])
+        start_session(create_test_answers, question_ids, [answer.id for answer in answers])
+
+        return self.question_at(quiz, request, 1)
+
+    def question_at(self, quiz, request, position):
+        active = session_question_at(request.user.id, quiz.id, position)
+        if not active or active[1] is None:
+            return Response({
+                "detail": "No question at this position in the active test."
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        session, question_id = active
+        serializer = QuizQuestionSerializer(QuizQuestion(id=question_id), context={
+            'request': request, 'shuffle_seed': session.shuffle_seed
+        })
+        return conditional_response(request, {
+            "quizz": quiz.title,
+            "position": position,
+            "test_list": [serializer.data]
+        })
 
     def forward(self, quiz, request, question_ids):
-        instance = UserTestAnswers.objects.filter(
+        end_session(request.user.id, quiz.id)
+        try:
+            with transaction.atomic():
+                return self.next_question(quiz, request, question_ids)
+        except IntegrityError:
+            return Response({
+                "detail": "The test was changed by another request, retry."
+            }, status=status.HTTP_409_CONFLICT)
+
+    def next_question(self, quiz, request, question_ids):
+        # Locking the attempt serializes concurrent "next" requests, so each sees the rows the other appended.
+        instance = UserTestAnswers.objects.select_for_update().filter(
             author=request.user, quiz=quiz, is_completed=False
         ).last()
 
@@ -294,11 +448,12 @@ class StartTestView(APIView):
                 "detail": "No active test found for this quiz."
             }, status=status.HTTP_404_NOT_FOUND)
 
-        answered_questions = TestAnswerQuestion.objects.filter(
+        answered = list(TestAnswerQuestion.objects.filter(
             test_answer_quiz=instance
-        ).values_list('question_id', flat=True)
+        ).values_list('question_id', 'position'))
+        answered_questions = [question_id for question_id, _ in answered]
 
-        if len(answered_questions) >= 25:
+        if len(answered_questions) >= UserTestAnswers.QUESTION_COUNT:
             instance.is_completed = True
             instance.save()
             return Response({
@@ -306,37 +461,36 @@ class StartTestView(APIView):
             }, status=status.HTTP_400_BAD_REQUEST)
 
         if question_ids:
-            available_test = TestAnswerQuestion.objects.filter(
-                test_answer_quiz=instance, question=question_ids,
-            ).first()
+            available_test, next_question = self.with_neighbour(instance, question_ids, 1)
 
             if available_test:
-                next_question = TestAnswerQuestion.objects.filter(
-                    test_answer_quiz=instance
-                ).filter(
-                    id__gt=available_test.id
-                ).order_by('question').first()
-
                 if next_question:
-                    serializer = QuizQuestionSerializer(next_question.question, context={'request': request})
-                    return Response({
+                    serializer = QuizQuestionSerializer(QuizQuestion(id=next_question.question_id), context={
+                        'request': request, 'shuffle_seed': instance.shuffle_seed
+                    })
+                    return conditional_response(request, {
                         "quizz": quiz.title,
                         "test_list": [serializer.data]
-                    }, status=status.HTTP_200_OK)
+                    })
                 else:
-                    quiz_questions = QuizQuestion.objects.filter(quiz=quiz).order_by('?')[:1]
-                    if quiz_questions.exists():
-                        random_question = quiz_questions.first()
+                    random_question = QuizQuestion.objects.filter(
+                        id__in=question_sampler.draw(quiz.id, exclude=answered_questions)
+                    ).first()
+                    if random_question:
+                        # Deleted questions leave gaps, so the row count is not the last position.
                         TestAnswerQuestion.objects.create(
                             question=random_question,
-                            test_answer_quiz=instance
+                            test_answer_quiz=instance,
+                            position=max((position or 0 for _, position in answered), default=0) + 1
                         )
 
-                        serializer = QuizQuestionSerializer(random_question, context={'request': request})
-                        return Response({
+                        serializer = QuizQuestionSerializer(random_question, context={
+                            'request': request, 'shuffle_seed': instance.shuffle_seed
+                        })
+                        return conditional_response(request, {
                             "quizz": quiz.title,
                             "test_list": [serializer.data]
-                        }, status=status.HTTP_200_OK)
+                        })
                     else:
                         return Response({
                             "detail": "No more questions available in the quiz."
@@ -346,54 +500,58 @@ class StartTestView(APIView):
             "detail": "The specified question is not part of the active test."
         }, status=status.HTTP_404_NOT_FOUND)
 
-    def backward(self, quiz, request, question_id):
-        instance = UserTestAnswers.objects.select_related('author', 'quiz').filter(
-            author=request.user,
-            quiz=quiz
-        ).last()
-
-        if not instance:
-            return Response({"detail": "No test answer found."}, status=status.HTTP_404_NOT_FOUND)
-
-        questions = TestAnswerQuestion.objects.filter(
-            test_answer_quiz=instance,
+    def with_neighbour(self, attempt, question_id, step):
+        """
+        Returns the answer row of ``question_id`` in the attempt and the row
+        ``step`` positions away from it (or None), with one indexed query.
+        """
+        current_position = TestAnswerQuestion.objects.filter(
+            test_answer_quiz=attempt, question_id=question_id
+        ).values('position')[:1]
+        rows = TestAnswerQuestion.objects.select_related('selected_answer', 'test_answer_quiz').filter(
+            Q(question_id=question_id) | Q(position=Subquery(current_position) + step),
+            test_answer_quiz=attempt
         )
 
-        question_ids = [str(question.question.id) for question in questions]
-
-        if str(question_id) in question_ids:
-            current_index = question_ids.index(str(question_id))
-            if current_index > 0:
-                previous_question_id = question_ids[current_index - 1]
-                previous_question = questions.filter(question__id=int(previous_question_id)).first()
-                get_question = get_object_or_404(QuizQuestion, id=previous_question.question.id)
-                question_options = QuestionOption.objects.filter(question=get_question)
-                serializer = QuizQuestionSerializer(get_question, context={'request': request})
-                serialized_data = serializer.data
-                get_true_answer = QuestionOption.objects.filter(
-                    question=get_question, is_correct=True)
-                true_answers = [{"id": option.id, "text": option.text} for option in get_true_answer]
-
-                select_answer = []
-                selected_answer = previous_question.selected_answer
-                if selected_answer:
-                    select_answer = [{"id": selected_answer.id, "text": selected_answer.text}]
-
-                return Response({
-                    "quizz": quiz.title,
-                    "test_list": serialized_data,
-                    "select_answer": select_answer,
-                    "true_answer": true_answers,
-                }, status=status.HTTP_200_OK)
+        current = neighbour = None
+        for row in rows:
+            if row.question_id == question_id:
+                current = row
             else:
-                return Response({
-                    "quizz": quiz.title,
-                    "test_list": []
-                }, status=status.HTTP_200_OK)
-        else:
+                neighbour = row
+        return current, neighbour
+
+    def backward(self, quiz, request, question_id):
+        end_session(request.user.id, quiz.id)
+        current, previous = self.with_neighbour(latest_attempt_id(request.user, quiz.id), question_id, -1)
+
+        if not current:
             return Response({"detail": "Question not found."}, status=status.HTTP_404_NOT_FOUND)
 
+        if not previous:
+            return conditional_response(request, {
+                "quizz": quiz.title,
+                "test_list": []
+            })
+
+        serializer = QuizQuestionSerializer(QuizQuestion(id=previous.question_id), context={
+            'request': request, 'shuffle_seed': previous.test_answer_quiz.shuffle_seed
+        })
+
+        select_answer = []
+        selected_answer = previous.selected_answer
+        if selected_answer:
+            select_answer = [{"id": selected_answer.id, "text": selected_answer.text}]
+
+        return conditional_response(request, {
+            "quizz": quiz.title,
+            "test_list": serializer.data,
+            "select_answer": select_answer,
+            "true_answer": get_correct_options(previous.question_id),
+        })
+
     def reset_test(self, quiz, request):
+        end_session(request.user.id, quiz.id)
         existing_test = UserTestAnswers.objects.filter(
             author=request.user, quiz=quiz
         ).last()
@@ -402,25 +560,24 @@ class StartTestView(APIView):
             existing_test.is_completed = True
             existing_test.save()
 
-        quiz_questions = QuizQuestion.objects.filter(quiz=quiz).order_by('?')[:1]
+        quiz_questions = QuizQuestion.objects.filter(id__in=question_sampler.draw(quiz.id))
 
-        create_test_answers = UserTestAnswers.objects.create(
-            author=request.user,
-            quiz=quiz,
-            is_completed=False
-        )
+        create_test_answers = self.create_attempt(quiz, request)
 
-        for question in quiz_questions:
+        for position, question in enumerate(quiz_questions, start=1):
             TestAnswerQuestion.objects.create(
                 question=question,
-                test_answer_quiz=create_test_answers
+                test_answer_quiz=create_test_answers,
+                position=position
             )
 
-        serializer = QuizQuestionSerializer(quiz_questions, many=True, context={'request': request})
-        return Response({
+        serializer = QuizQuestionSerializer(quiz_questions, many=True, context={
+            'request': request, 'shuffle_seed': create_test_answers.shuffle_seed
+        })
+        return conditional_response(request, {
             "quizz": quiz.title,
             "test_list": serializer.data
-        }, status=status.HTTP_200_OK)
+        })
 
 
 
@@ -449,65 +606,135 @@ class CheckQuizView(APIView):
         ]
     )
     def get(self, request, *args, **kwargs):
-        queryset = get_object_or_404(QuestionOption, id=kwargs.get('option_id'))
-
-        instance = UserTestAnswers.objects.select_related('author', 'quiz').filter(
-            author=request.user,
-            quiz=queryset.question.quiz
-        ).last()
+        option_id = kwargs.get('option_id')
+        entry = get_option_entry(option_id)
+        if entry is None:
+            raise Http404
+        question_id, quiz_id, is_correct = entry
+
+        if request.user.is_authenticated and not record_session_answer(
+                request.user.id, quiz_id, question_id, option_id
+        ):
+            record_answer(request.user, quiz_id, question_id, option_id)
+
+        if is_correct:
+            return Response({'msg': True}, status=status.HTTP_200_OK)
 
-        get_back_question = TestAnswerQuestion.objects.select_related('test_answer_quiz').filter(
-            test_answer_quiz=instance,
-            question=queryset.question
-        ).last()
+        return Response({'msg': False, "true_answer": get_correct_options(question_id)}, status=status.HTTP_200_OK)
 
-        if queryset.is_correct:
-            get_back_question.selected_answer = queryset
-            get_back_question.save()
-            return Response({'msg': True}, status=status.HTTP_200_OK)
 
-        get_true_answer = QuestionOption.objects.select_related('question').filter(
-            question=queryset.question, is_correct=True
-        )
-        get_back_question.selected_answer = queryset
-        get_back_question.save()
-        true_answers = [{"id": option.id, "text": option.text} for option in get_true_answer]
+class SubmitAnswersView(APIView):
+    permission_classes = [IsAuthenticated]
 
-        return Response({'msg': False, "true_answer": true_answers}, status=status.HTTP_200_OK)
+    @swagger_auto_schema(
+        tags=['Quiz'],
+        operation_summary="Submit several answers of the active test at once",
+        operation_description=(
+                "Records the selected option of each question of the user's active attempt of the quiz "
+                "and returns whether each answer is correct."
+        ),
+        request_body=AnswerSubmissionSerializer,
+        responses={
+            200: openapi.Response(
+                description="Answers recorded",
+                examples={"application/json": {"results": [
+                    {"question_id": 1, "option_id": 2, "is_correct": False, "correct_option_ids": [3]}
+                ], "correct": 0}},
+            ),
+            400: openapi.Response(description="Invalid answers"),
+        },
+    )
+    def post(self, request, quizz_id):
+        serializer = AnswerSubmissionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        selected = {answer['question_id']: answer['option_id'] for answer in serializer.validated_data['answers']}
+
+        entries = get_option_entries(selected.values())
+
+        with transaction.atomic():
+            rows = list(active_attempt_answers(request.user, quizz_id, selected).only(
+                'id', 'question_id', 'selected_answer_id', 'test_answer_quiz_id'
+            ))
+            rows_by_question = {row.question_id: row for row in rows}
+
+            invalid = [
+                question_id for question_id, option_id in selected.items()
+                if question_id not in rows_by_question
+                or entries.get(option_id, (None, None, None))[:2] != (question_id, quizz_id)
+            ]
+            if invalid:
+                return Response({'error': 'Invalid answers', 'question_ids': invalid},
+                                status=status.HTTP_400_BAD_REQUEST)
+
+            # Answers still held by a deck session are written first so they are not overwritten with stale rows.
+            session = end_session(request.user.id, quizz_id)
+            if session is not None:
+                for row in rows:
+                    if row.question_id in session.answers:
+                        row.selected_answer_id = session.answers[row.question_id]
+
+            changes = [(row.selected_answer_id, selected[row.question_id]) for row in rows]
+            changed_rows = [row for row in rows if row.selected_answer_id != selected[row.question_id]]
+            for row in changed_rows:
+                row.selected_answer_id = selected[row.question_id]
+            if changed_rows:
+                TestAnswerQuestion.objects.bulk_update(changed_rows, ['selected_answer'])
+                apply_score_changes(rows[0].test_answer_quiz_id, changes)
+
+        correct_option_ids = get_correct_option_ids(selected)
+        results = [
+            {
+                'question_id': question_id,
+                'option_id': option_id,
+                'is_correct': entries[option_id][2],
+                'correct_option_ids': correct_option_ids.get(question_id, []),
+            }
+            for question_id, option_id in selected.items()
+        ]
+        return Response({'results': results, 'correct': sum(result['is_correct'] for result in results)},
+                        status=status.HTTP_200_OK)
 
 
 class UploadTestFileView(APIView):
-    permission_classes = [AllowAny]
+    permission_classes = [IsAdminUser]
     parser_classes = [MultiPartParser, FormParser]
 
     @swagger_auto_schema(
         tags=['Quiz'],
-        operation_summary="Upload and process a test file",
+        operation_summary="Upload a test file for import",
         operation_description=(
-                "This endpoint allows users to upload a test file for processing. "
-                "The file is temporarily saved, processed, and deleted afterward. "
-                "A success or error response is returned based on the processing result."
+                "This endpoint allows admins to upload a test file for processing. "
+                "The file is queued for a background import and the job id is returned at once. "
+                "Poll /import-jobs/<job_id>/ for progress and errors."
         ),
         manual_parameters=[
             openapi.Parameter(
                 name="file",
                 in_=openapi.IN_FORM,
                 type=openapi.TYPE_FILE,
-                description="The file to upload and process",
+                description="A .txt question file, or a .zip archive of them with an optional manifest.json",
                 required=True,
             ),
+            openapi.Parameter(
+                name="quiz_id",
+                in_=openapi.IN_FORM,
+                type=openapi.TYPE_INTEGER,
+                description="The quiz to import the questions into",
+                required=False,
+            ),
             openapi.Parameter(
                 name="category_id",
                 in_=openapi.IN_FORM,
                 type=openapi.TYPE_INTEGER,
-                description="The category ID to associate with the test",
-                required=True,
+                description="Without quiz_id: create a quiz named after the file in this category. "
+                            "For archives: the category of quizzes created for files not in the manifest",
+                required=False,
             )
         ],
         responses={
-            201: openapi.Response(
-                description="File processed successfully",
-                examples={"application/json": {"message": "File processed successfully"}},
+            202: openapi.Response(
+                description="Import queued",
+                examples={"application/json": {"job_id": 1, "quiz_id": 1, "status": "pending"}},
             ),
             400: openapi.Response(
                 description="Error occurred",
@@ -517,33 +744,87 @@ class UploadTestFileView(APIView):
     )
     def post(self, request):
         file = request.FILES.get('file')
+        quiz_id = request.data.get('quiz_id')
         category_id = request.data.get('category_id')
 
         if not file:
             return Response({'error': 'No file provided'}, status=status.HTTP_400_BAD_REQUEST)
 
-        if not category_id:
-            return Response({'error': 'No category ID provided'}, status=status.HTTP_400_BAD_REQUEST)
+        author = request.user
+
+        if file.name.lower().endswith('.zip'):
+            category = None
+            if category_id:
+                try:
+                    category = SubCategory.objects.get(id=int(category_id))
+                except (ValueError, SubCategory.DoesNotExist):
+                    return Response({'error': 'Invalid or non-existent category ID'},
+                                    status=status.HTTP_400_BAD_REQUEST)
+            job = enqueue_archive_import(file, category, author)
+            return Response({'job_id': job.id, 'status': job.status}, status=status.HTTP_202_ACCEPTED)
+
+        if quiz_id:
+            try:
+                quiz = Quiz.objects.get(id=int(quiz_id))
+            except (ValueError, Quiz.DoesNotExist):
+                return Response({'error': 'Invalid or non-existent quiz ID'}, status=status.HTTP_400_BAD_REQUEST)
+        elif category_id:
+            try:
+                category = SubCategory.objects.get(id=int(category_id))
+            except (ValueError, SubCategory.DoesNotExist):
+                return Response({'error': 'Invalid or non-existent category ID'},
+                                status=status.HTTP_400_BAD_REQUEST)
+            quiz = Quiz(title=os.path.splitext(file.name)[0], category=category)
+        else:
+            return Response({'error': 'No quiz or category ID provided'}, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            if not quiz.pk:
+                quiz.save()
+            job = enqueue_import(file, quiz, author)
 
-        try:
-            category_id = int(category_id)
-            category = SubCategory.objects.get(id=category_id)
-        except (ValueError, SubCategory.DoesNotExist):
-            return Response({'error': 'Invalid or non-existent category ID'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'job_id': job.id, 'quiz_id': quiz.id, 'status': job.status},
+                        status=status.HTTP_202_ACCEPTED)
 
-        file_path = default_storage.save(file.name, file)
-        full_file_path = os.path.join(settings.MEDIA_ROOT, file_path)
 
-        if not default_storage.exists(file_path):
-            return Response({'error': f"File not found: {file_path}"}, status=status.HTTP_400_BAD_REQUEST)
+class QuizExportView(APIView):
+    permission_classes = [IsAdminUser]
 
-        try:
-            import_tests_from_file(full_file_path, category)
-            return Response({'message': 'File processed successfully'}, status=status.HTTP_201_CREATED)
-        except Exception as e:
-            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
-        finally:
-            default_storage.delete(file_path)
+    @swagger_auto_schema(
+        tags=['Quiz'],
+        operation_summary="Export the questions of a quiz",
+        operation_description="Streams every question with its options in the upload text format or as JSON lines.",
+        manual_parameters=[
+            openapi.Parameter(
+                'export_format', openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=list(EXPORT_FORMATS),
+                description="txt (default) or jsonl", required=False
+            ),
+        ],
+    )
+    def get(self, request, quizz_id):
+        # Not "format": DRF reserves that query parameter for renderer negotiation.
+        export_format = request.query_params.get('export_format', 'txt')
+        if export_format not in EXPORT_FORMATS:
+            return Response({'error': 'Unknown export format'}, status=status.HTTP_400_BAD_REQUEST)
+
+        quiz = get_object_or_404(Quiz.objects.only('id'), id=quizz_id)
+        response = StreamingHttpResponse(iter_export(quiz.id, export_format),
+                                         content_type=EXPORT_FORMATS[export_format])
+        response['Content-Disposition'] = f'attachment; filename="quiz-{quiz.id}.{export_format}"'
+        return response
+
+
+class ImportJobDetailView(APIView):
+    permission_classes = [IsAdminUser]
+
+    @swagger_auto_schema(
+        tags=['Quiz'],
+        operation_summary="Get the status of a question import job",
+        responses={200: ImportJobSerializer()},
+    )
+    def get(self, request, job_id):
+        job = get_object_or_404(ImportJob, id=job_id)
+        return Response(ImportJobSerializer(job).data, status=status.HTTP_200_OK)
 
 
 class FinishTestAuthor(APIView):
@@ -559,22 +840,54 @@ class FinishTestAuthor(APIView):
         tags=['Quiz'],
     )
     def get(self, request):
-        instance = UserTestAnswers.objects.select_related('author').filter(
+        flush_user_sessions(request.user.id)
+        instance = UserTestAnswers.objects.with_results(request.user).filter(
             author=request.user
-        ).last()
-        count_true_answers = TestAnswerQuestion.objects.select_related('test_answer_quiz', 'selected_answer').filter(
-            test_answer_quiz=instance, selected_answer__is_correct=True
-        ).count()
-        persentage_true_answers = (count_true_answers * 100) / 25
+        ).order_by('-id').first()
+        if not instance:
+            return Response({"detail": "No test answers found."}, status=status.HTTP_404_NOT_FOUND)
+
+        count_true_answers = instance.correct_count
+        persentage_true_answers = (
+            count_true_answers * 100 / instance.question_count if instance.question_count else 0
+        )
         responce_data = {
             'results': instance,
-            'count_correct_answers': count_true_answers,
-            'persentage_correct_answers': persentage_true_answers
+            'count_true_answers': count_true_answers,
+            'persentage_true_answers': persentage_true_answers
         }
         serializer = TestResultSerializer(responce_data, context={'request': request})
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+class AttemptHistoryView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        tags=['Quiz'],
+        operation_summary="List the user's test attempts",
+        operation_description="Newest first, with cursor pagination. Scores are read from the attempt counters "
+                              "after the answers of active deck tests are written back.",
+        manual_parameters=[
+            openapi.Parameter('cursor', openapi.IN_QUERY, type=openapi.TYPE_STRING, required=False),
+            openapi.Parameter('page_size', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, required=False),
+        ],
+        responses={200: AttemptHistorySerializer(many=True)},
+    )
+    def get(self, request):
+        flush_user_sessions(request.user.id)
+        queryset = UserTestAnswers.objects.filter(author=request.user).annotate(
+            quiz_title=F('quiz__title')
+        ).only(
+            'id', 'quiz_id', 'created_at', 'is_completed', 'question_count', 'answered_count', 'correct_count'
+        )
+
+        paginator = AttemptHistoryPagination()
+        page = paginator.paginate_queryset(queryset, request)
+        serializer = AttemptHistorySerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+
 class BackQuestionDetailView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -608,6 +921,7 @@ class BackQuestionDetailView(APIView):
         tags=['Quiz']
     )
     def get(self, request, *args, **kwargs):
+        flush_user_sessions(request.user.id)
         instance = get_object_or_404(TestAnswerQuestion, id=kwargs.get('quizz_id'))
 
         serializer = TestAnswerQuestionSerializer(instance, context={'request': request})
@@ -186,6 +186,11 @@ SIMPLE_JWT = {
     'BLACKLIST_TOKEN_LIST': True,
 }
 
+# apps.quizz refuses to start on a per-process cache (LocMemCache): web
+# workers, run_import_jobs and flush_test_sessions share version stamps and
+# test sessions through it.
+QUIZZ_ALLOW_PROCESS_LOCAL_CACHE = False
+
 # JAZZMIN_SETTINGS = {
 #     "site_title": "Панель администратора тестового приложения OXU",
 #     "site_header": "Моя администрация",
@@ -1,3 +1,5 @@
+import os
+
 from config.settings.base import *
 
 
@@ -14,4 +16,13 @@ DATABASES = {
         "HOST": "localhost",
         "PORT": 5432,
     }
-}
\ No newline at end of file
+}
+
+# Version stamps, question pools and test sessions must be visible to every
+# web and worker process.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('REDIS_URL', 'redis://127.0.0.1:6379/1'),
+    }
+}
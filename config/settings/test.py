@@ -0,0 +1,11 @@
+from .local import *
+
+
+# Tests run in a single process, and query-count assertions expect a cache
+# that does not touch the database.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+QUIZZ_ALLOW_PROCESS_LOCAL_CACHE = True